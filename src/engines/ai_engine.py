@@ -10,12 +10,13 @@ Versión: 1.0
 
 import json
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
 from openai import OpenAI
 import google.generativeai as genai
 from dotenv import load_dotenv
 import yaml
 import logging
+import numpy as np
 
 # v1.4: Importar parseo robusto con Pydantic
 try:
@@ -31,18 +32,76 @@ load_dotenv()
 # Configurar logging
 logger = logging.getLogger(__name__)
 
+# v2.2: Sinónimos de decisión → decisión canónica
+DECISION_MAP = {
+    'COMPRA': 'COMPRA', 'BUY': 'COMPRA', 'LONG': 'COMPRA',
+    'VENTA': 'VENTA', 'SELL': 'VENTA', 'SHORT': 'VENTA',
+    'ESPERA': 'ESPERA', 'HOLD': 'ESPERA', 'WAIT': 'ESPERA', 'NEUTRAL': 'ESPERA'
+}
+
+# v2.2: Palabras clave del fallback parser (construidas una vez, no por respuesta)
+FALLBACK_BUY_KEYWORDS = frozenset({'compra', 'buy', 'long', 'bullish', 'alcista', 'subir', 'up', 'comprar'})
+FALLBACK_SELL_KEYWORDS = frozenset({'venta', 'sell', 'short', 'bearish', 'bajista', 'bajar', 'down', 'vender'})
+FALLBACK_WAIT_KEYWORDS = frozenset({'espera', 'wait', 'hold', 'neutral', 'lateral', 'no operar', 'esperar'})
+
+# Zonas del rango de Bollinger devueltas por validate_entries (índice = código)
+RANGE_ZONES = ('soporte', 'medio', 'resistencia', 'desconocida')
+
+
+def validate_entries(
+    rsi: np.ndarray,
+    vol: np.ndarray,
+    price: np.ndarray,
+    bb_lo: np.ndarray,
+    bb_hi: np.ndarray,
+    rsi_min: float = 35,
+    rsi_max: float = 65,
+    min_volume: float = 1.0
+):
+    """
+    Valida entradas de varios símbolos a la vez (una posición por símbolo).
+
+    Filtro de cribado vectorizado: RSI dentro de [rsi_min, rsi_max],
+    volumen >= min_volume y zona del precio dentro de las Bandas de
+    Bollinger (<=25% soporte, >=75% resistencia). Los umbrales por defecto
+    son los de los tests de validación, no los del agente de tendencia
+    (que usa volumen > 0.7); pásalos explícitamente para otros criterios.
+
+    Returns:
+        Tupla (ok, zone): ok es un array bool y zone un array int con el
+        índice en RANGE_ZONES. Como el agente de rango, sin bandas (0) la
+        zona es 'desconocida' y con bandas degeneradas es 'medio'.
+    """
+    rsi = np.asarray(rsi, dtype=np.float64)
+    vol = np.asarray(vol, dtype=np.float64)
+    price = np.asarray(price, dtype=np.float64)
+    bb_lo = np.asarray(bb_lo, dtype=np.float64)
+    bb_hi = np.asarray(bb_hi, dtype=np.float64)
+
+    ok = (rsi >= rsi_min) & (rsi <= rsi_max) & (vol >= min_volume)
+
+    has_bands = (bb_lo != 0) & (bb_hi != 0)
+    bb_range = bb_hi - bb_lo
+    safe_range = np.where(bb_range > 0, bb_range, 1.0)
+    pct = np.where(bb_range > 0, (price - bb_lo) / safe_range * 100, 50.0)
+    zone = np.where(pct <= 25, 0, np.where(pct >= 75, 2, 1))
+    zone = np.where(has_bands, zone, 3)
+
+    return ok, zone
+
 
 class AIEngine:
     """
     Motor de IA que soporta múltiples proveedores (DeepSeek, OpenAI, Gemini).
     """
 
-    def __init__(self, config_path: str = "config/config.yaml"):
+    def __init__(self, config_path: Union[str, Dict[str, Any]] = "config/config.yaml"):
         """
         Inicializa el motor de IA.
 
         Args:
-            config_path: Ruta al archivo de configuración YAML
+            config_path: Ruta al archivo de configuración YAML, o el dict
+                de configuración ya cargado (v2.2)
         """
         self.config = self._load_config(config_path)
         self.provider = self.config['ai_provider']
@@ -79,8 +138,11 @@ class AIEngine:
         else:
             logger.info(f"AI Engine inicializado: {self.provider} - {self.model}")
 
-    def _load_config(self, config_path: str) -> Dict[str, Any]:
-        """Carga la configuración desde el archivo YAML."""
+    def _load_config(self, config_path: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Carga la configuración desde el archivo YAML (o usa el dict recibido)."""
+        # v2.2: Aceptar config ya parseada (evita volcarla a un YAML temporal)
+        if isinstance(config_path, dict):
+            return config_path
         try:
             with open(config_path, 'r', encoding='utf-8') as f:
                 config = yaml.safe_load(f)
@@ -544,12 +606,7 @@ RESPONDE:
 
             # v2.2: Normalizar la decisión con mapeo de sinónimos
             decision_data['decision'] = str(decision_data['decision']).upper()
-            decision_map = {
-                'COMPRA': 'COMPRA', 'BUY': 'COMPRA', 'LONG': 'COMPRA',
-                'VENTA': 'VENTA', 'SELL': 'VENTA', 'SHORT': 'VENTA',
-                'ESPERA': 'ESPERA', 'HOLD': 'ESPERA', 'WAIT': 'ESPERA', 'NEUTRAL': 'ESPERA'
-            }
-            decision_data['decision'] = decision_map.get(decision_data['decision'], 'ESPERA')
+            decision_data['decision'] = DECISION_MAP.get(decision_data['decision'], 'ESPERA')
 
             # v2.2: Validar y normalizar confidence
             if 'confidence' in decision_data:
@@ -577,14 +634,10 @@ RESPONDE:
         decision = 'ESPERA'
         confidence = 0.5
 
-        # Buscar señales de COMPRA
-        buy_keywords = ['compra', 'buy', 'long', 'bullish', 'alcista', 'subir', 'up', 'comprar']
-        sell_keywords = ['venta', 'sell', 'short', 'bearish', 'bajista', 'bajar', 'down', 'vender']
-        wait_keywords = ['espera', 'wait', 'hold', 'neutral', 'lateral', 'no operar', 'esperar']
-
-        buy_score = sum(1 for kw in buy_keywords if kw in text_lower)
-        sell_score = sum(1 for kw in sell_keywords if kw in text_lower)
-        wait_score = sum(1 for kw in wait_keywords if kw in text_lower)
+        # Contar palabras clave presentes (búsqueda por subcadena: 'compra' cubre 'comprar')
+        buy_score = sum(1 for kw in FALLBACK_BUY_KEYWORDS if kw in text_lower)
+        sell_score = sum(1 for kw in FALLBACK_SELL_KEYWORDS if kw in text_lower)
+        wait_score = sum(1 for kw in FALLBACK_WAIT_KEYWORDS if kw in text_lower)
 
         if buy_score > sell_score and buy_score > wait_score:
             decision = 'COMPRA'
@@ -11,9 +11,10 @@ Versión: 1.0
 import os
 import logging
 import time
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Union
 from datetime import datetime
 import ccxt
+import numpy as np
 from dotenv import load_dotenv
 import yaml
 
@@ -37,12 +38,13 @@ class MarketEngine:
     Motor de mercado que soporta múltiples exchanges y brokers.
     """
 
-    def __init__(self, config_path: str = "config/config.yaml"):
+    def __init__(self, config_path: Union[str, Dict[str, Any]] = "config/config.yaml"):
         """
         Inicializa el motor de mercado.
 
         Args:
-            config_path: Ruta al archivo de configuración YAML
+            config_path: Ruta al archivo de configuración YAML, o el dict
+                de configuración ya cargado (v2.2)
         """
         self.config = self._load_config(config_path)
         self.market_type = self.config['market_type']
@@ -72,8 +74,11 @@ class MarketEngine:
         logger.info(f"Market Engine inicializado: {self.market_type} - Modo: {self.mode}")
         logger.info(f"Protección slippage: verificación={self.price_verification_enabled}, limit_orders={self.use_limit_orders}")
 
-    def _load_config(self, config_path: str) -> Dict[str, Any]:
-        """Carga la configuración desde el archivo YAML."""
+    def _load_config(self, config_path: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Carga la configuración desde el archivo YAML (o usa el dict recibido)."""
+        # v2.2: Aceptar config ya parseada (evita volcarla a un YAML temporal)
+        if isinstance(config_path, dict):
+            return config_path
         try:
             with open(config_path, 'r', encoding='utf-8') as f:
                 config = yaml.safe_load(f)
@@ -790,31 +795,35 @@ class MarketEngine:
                 }
 
             # Calcular liquidez disponible en el lado relevante
+            bids_arr = np.asarray(bids, dtype=np.float64)[:, :2]
+            asks_arr = np.asarray(asks, dtype=np.float64)[:, :2]
+
             if side == 'buy':
                 # Para comprar, miramos los asks
-                book_side = asks
+                book_side = asks_arr
                 reference_price = best_ask
             else:
                 # Para vender, miramos los bids
-                book_side = bids
+                book_side = bids_arr
                 reference_price = best_bid
 
             # Calcular cantidad necesaria en unidades del activo
             order_size_units = order_size_usd / reference_price
 
-            # Simular ejecución para estimar slippage
-            filled_units = 0
-            total_cost = 0
-            levels_consumed = 0
-
-            for price, volume in book_side:
-                if filled_units >= order_size_units:
-                    break
-
-                fill_amount = min(volume, order_size_units - filled_units)
-                filled_units += fill_amount
-                total_cost += fill_amount * price
-                levels_consumed += 1
+            # Simular ejecución para estimar slippage (vectorizado sobre niveles)
+            prices = book_side[:, 0]
+            volumes = book_side[:, 1]
+            cum_volume = np.cumsum(volumes)
+            remaining_before = np.maximum(order_size_units - (cum_volume - volumes), 0.0)
+            fill_amounts = np.minimum(volumes, remaining_before)
+
+            filled_units = float(fill_amounts.sum())
+            total_cost = float(fill_amounts @ prices)
+            if order_size_units > 0:
+                # Niveles recorridos hasta cubrir la orden (o todo el libro)
+                levels_consumed = min(int(np.searchsorted(cum_volume, order_size_units)) + 1, len(volumes))
+            else:
+                levels_consumed = 0
 
             # Verificar si hay suficiente liquidez
             if filled_units < order_size_units * 0.95:  # Al menos 95% de la orden
@@ -843,8 +852,8 @@ class MarketEngine:
                 }
 
             # Calcular métricas adicionales
-            bid_volume_usd = sum([b[0] * b[1] for b in bids[:20]])
-            ask_volume_usd = sum([a[0] * a[1] for a in asks[:20]])
+            bid_volume_usd = float(bids_arr[:20, 0] @ bids_arr[:20, 1])
+            ask_volume_usd = float(asks_arr[:20, 0] @ asks_arr[:20, 1])
 
             # Todo OK
             return {
@@ -24,10 +24,206 @@ import os
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 from collections import deque
+from dataclasses import dataclass, asdict, fields
 import threading
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# Campos numéricos de trade agregados en _get_trade_stats, en columnas (Structure-of-Arrays).
+# Latencia y slippage ya tienen sus deques de samples; el resto vive en self.trades.
+TRADE_COLUMNS = ('pnl', 'hold_time_minutes')
+
+# Log binario append-only de trades: un registro de tamaño fijo por trade.
+# Los campos de texto se guardan como índices en una tabla de cadenas aparte
+# (_StringTable), así cualquier símbolo/lado/régimen/agente se recupera intacto.
+TRADE_RECORD_DTYPE = np.dtype([
+    ('ts', 'i8'),                 # epoch en milisegundos
+    ('symbol', 'u4'),             # índices en la tabla de cadenas
+    ('side', 'u4'),
+    ('regime', 'u4'),
+    ('agent_type', 'u4'),
+    ('pnl', 'f8'),
+    ('pnl_percent', 'f8'),
+    ('entry_price', 'f8'),
+    ('exit_price', 'f8'),
+    ('hold_time_minutes', 'i4'),
+    ('latency_ms', 'f8'),
+    ('slippage_percent', 'f8'),
+])
+
+# Formato anterior (<base>.trades.bin): texto de ancho fijo y side/regime como
+# índice en tuplas cerradas. Solo se lee para migrarlo al formato actual.
+LEGACY_TRADE_RECORD_DTYPE = np.dtype([
+    ('ts', 'i8'),
+    ('symbol', 'S20'),
+    ('side', 'u1'),
+    ('regime', 'u1'),
+    ('agent_type', 'S24'),
+    ('pnl', 'f8'),
+    ('pnl_percent', 'f8'),
+    ('entry_price', 'f8'),
+    ('exit_price', 'f8'),
+    ('hold_time_minutes', 'i4'),
+    ('latency_ms', 'f8'),
+    ('slippage_percent', 'f8'),
+])
+LEGACY_TRADE_SIDES = ('long', 'short')
+LEGACY_TRADE_REGIMES = ('unknown', 'trend', 'reversal', 'range')
+
+# Trades recientes que se mantienen en memoria al cargar
+MAX_TRADES_IN_MEMORY = 1000
+
+# Ventanas (días) con Sharpe mantenido incrementalmente
+SHARPE_WINDOWS = (30, 90)
+
+# Días de retornos diarios conservados
+MAX_DAILY_RETURNS = 365
+
+
+@dataclass(slots=True)
+class TradeRec:
+    """Trade completado (campos fijos, sin dict por instancia)."""
+    timestamp: str
+    symbol: str
+    side: str
+    pnl: float
+    pnl_percent: float
+    entry_price: float
+    exit_price: float
+    regime: str = 'unknown'
+    agent_type: str = 'general'
+    hold_time_minutes: int = 0
+    latency_ms: float = 0
+    slippage_percent: float = 0
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TradeRec':
+        """Construye un TradeRec desde el formato dict anterior (claves extra se ignoran)."""
+        known = {f.name for f in fields(cls)}
+        values = {k: v for k, v in data.items() if k in known}
+        values.setdefault('timestamp', datetime.now().isoformat())
+        for name in ('symbol', 'side'):
+            values.setdefault(name, '')
+        for name in ('pnl', 'pnl_percent', 'entry_price', 'exit_price'):
+            values[name] = values.get(name) or 0
+        return cls(**values)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class _StringTable:
+    """
+    Tabla de cadenas append-only para el log binario de trades.
+
+    Una cadena por línea (codificada en JSON); el índice es el número de línea.
+    Las cadenas nuevas se escriben antes que los registros que las usan.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.strings: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        complete = data[:data.rfind(b'\n') + 1]
+        if len(complete) < len(data):
+            # Última línea a medias (corte durante una escritura): se descarta
+            with open(self.path, 'r+b') as f:
+                f.truncate(len(complete))
+        for line in complete.decode('utf-8').splitlines():
+            value = json.loads(line)
+            self.ids.setdefault(value, len(self.strings))
+            self.strings.append(value)
+
+    def intern(self, values: List[str]) -> List[int]:
+        """Índices de las cadenas, persistiendo primero las que no existían."""
+        new = list(dict.fromkeys(v for v in values if v not in self.ids))
+        if new:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(v) + '\n' for v in new))
+            for value in new:
+                self.ids[value] = len(self.strings)
+                self.strings.append(value)
+        return [self.ids[v] for v in values]
+
+    def get(self, index: int) -> str:
+        return self.strings[index] if index < len(self.strings) else ''
+
+
+class _RollingStats:
+    """
+    Media y varianza sobre una ventana deslizante (algoritmo de Welford).
+
+    push() es O(1): añade el nuevo valor y retira el que sale de la ventana.
+    """
+
+    def __init__(self, window: int):
+        self.values: deque = deque(maxlen=window)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def push(self, x: float):
+        if len(self.values) == self.values.maxlen:
+            self._remove(self.values[0])
+        self.values.append(x)
+
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def _remove(self, x: float):
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        self.count -= 1
+        delta = x - self.mean
+        self.mean -= delta / self.count
+        self.m2 -= delta * (x - self.mean)
+
+    @property
+    def variance(self) -> float:
+        """Varianza poblacional de la ventana."""
+        if self.count == 0:
+            return 0.0
+        return max(self.m2 / self.count, 0.0)
+
+
+class _ReturnBuffer:
+    """
+    Ring buffer de float64 con los retornos diarios.
+
+    Cada valor se escribe dos veces (slot y slot + capacidad), de modo que los
+    últimos N retornos son siempre un slice contiguo del array, sin copias.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buf = np.zeros(2 * capacity, dtype=np.float64)
+        self._head = 0
+        self.count = 0
+
+    def push(self, x: float):
+        self._buf[self._head] = x
+        self._buf[self._head + self.capacity] = x
+        self._head = (self._head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def last(self, n: Optional[int] = None) -> np.ndarray:
+        """Vista de los últimos n retornos (todos si n es None), en orden cronológico."""
+        n = self.count if n is None else max(0, min(n, self.count))
+        end = self._head + self.capacity
+        return self._buf[end - n:end]
+
 
 class InstitutionalMetrics:
     """
@@ -38,6 +234,12 @@ class InstitutionalMetrics:
     def __init__(self, config: Dict[str, Any] = None, data_path: str = "data/metrics.json"):
         self.config = config or {}
         self.data_path = data_path
+        base_path = os.path.splitext(data_path)[0]
+        self.trades_log_path = base_path + '.trades.v2.bin'
+        self.trades_strings_path = base_path + '.trades.strings'
+        self.legacy_trades_log_path = base_path + '.trades.bin'
+        self._strings: Optional[_StringTable] = None  # se abre en _load_data
+        self._trades_logged = 0  # Registros escritos en el log binario
         self._lock = threading.Lock()
 
         # Parámetros
@@ -45,8 +247,11 @@ class InstitutionalMetrics:
         self.trading_days_per_year = self.config.get('trading_days_per_year', 365)  # Crypto = 365
 
         # Almacenamiento de datos
-        self.daily_returns: deque = deque(maxlen=365)  # Últimos 365 días
-        self.trades: List[Dict] = []
+        self.daily_returns: deque = deque(maxlen=MAX_DAILY_RETURNS)  # Últimos 365 días
+        self._returns = _ReturnBuffer(MAX_DAILY_RETURNS)
+        self._return_windows = {w: _RollingStats(w) for w in SHARPE_WINDOWS}
+        self.trades: List[TradeRec] = []
+        self._init_trade_columns()
         self.latency_samples: deque = deque(maxlen=1000)
         self.slippage_samples: deque = deque(maxlen=1000)
 
@@ -118,29 +323,28 @@ class InstitutionalMetrics:
             slippage_percent: Slippage experimentado
         """
         with self._lock:
-            trade = {
-                'timestamp': datetime.now().isoformat(),
-                'symbol': symbol,
-                'side': side,
-                'pnl': pnl,
-                'pnl_percent': pnl_percent,
-                'entry_price': entry_price,
-                'exit_price': exit_price,
-                'regime': regime,
-                'agent_type': agent_type,
-                'hold_time_minutes': hold_time_minutes,
-                'latency_ms': latency_ms,
-                'slippage_percent': slippage_percent
-            }
+            trade = TradeRec(
+                timestamp=datetime.now().isoformat(),
+                symbol=symbol,
+                side=side,
+                pnl=pnl,
+                pnl_percent=pnl_percent,
+                entry_price=entry_price,
+                exit_price=exit_price,
+                regime=regime,
+                agent_type=agent_type,
+                hold_time_minutes=hold_time_minutes,
+                latency_ms=latency_ms,
+                slippage_percent=slippage_percent
+            )
             self.trades.append(trade)
+            self._append_trade_columns(trade)
 
-            # Actualizar tracking por régimen
-            if regime in self.regime_performance:
-                if pnl > 0:
-                    self.regime_performance[regime]['wins'] += 1
-                else:
-                    self.regime_performance[regime]['losses'] += 1
-                self.regime_performance[regime]['total_pnl'] += pnl
+            # Actualizar tracking por régimen (una sola búsqueda del régimen)
+            perf = self.regime_performance.get(regime)
+            if perf is not None:
+                perf['wins' if pnl > 0 else 'losses'] += 1
+                perf['total_pnl'] += pnl
 
             # Registrar samples de latencia y slippage
             if latency_ms > 0:
@@ -154,8 +358,8 @@ class InstitutionalMetrics:
                         f"(umbral: {self.slippage_alert_threshold}%)"
                     )
 
-            # Persistir
-            self._save_data()
+            # Persistir: un registro binario en modo append (O(1) por trade)
+            self._append_trade_log([trade])
 
     def record_limit_order(self, status: str, symbol: str = "", order_type: str = ""):
         """
@@ -319,6 +523,9 @@ class InstitutionalMetrics:
                 'return_percent': return_percent,
                 'capital': capital
             })
+            self._returns.push(return_percent)
+            for stats in self._return_windows.values():
+                stats.push(return_percent)
 
             # Actualizar peak y drawdown
             self.current_capital = capital
@@ -357,16 +564,23 @@ class InstitutionalMetrics:
             if len(self.daily_returns) < 5:
                 return 0.0
 
-            # Obtener retornos del período
-            returns = [r['return_percent'] for r in list(self.daily_returns)[-period_days:]]
+            window = self._return_windows.get(period_days)
+            if window is not None:
+                # O(1): media/varianza mantenidas en record_daily_return
+                n = window.count
+                mean_return = window.mean
+                variance = window.variance
+            else:
+                returns = self._returns.last(period_days)
+                n = len(returns)
+                mean_return = float(returns.mean()) if n else 0.0
+                variance = float(returns.var()) if n else 0.0
 
-            if len(returns) < 2:
+            if n < 2:
                 return 0.0
 
-            # Calcular media y desviación estándar
-            mean_return = sum(returns) / len(returns)
-            variance = sum((r - mean_return) ** 2 for r in returns) / len(returns)
-            std_dev = math.sqrt(variance) if variance > 0 else 0.001
+            # Varianzas residuales (redondeo numérico) se tratan como cero
+            std_dev = math.sqrt(variance) if variance > 1e-12 else 0.001
 
             # Risk free rate diario
             daily_rf = self.risk_free_rate / self.trading_days_per_year
@@ -393,21 +607,21 @@ class InstitutionalMetrics:
             if len(self.daily_returns) < 5:
                 return 0.0
 
-            returns = [r['return_percent'] for r in list(self.daily_returns)[-period_days:]]
+            returns = self._returns.last(period_days)
 
             if len(returns) < 2:
                 return 0.0
 
-            mean_return = sum(returns) / len(returns)
+            mean_return = float(returns.mean())
             daily_rf = self.risk_free_rate / self.trading_days_per_year
 
             # Solo retornos negativos para downside deviation
-            negative_returns = [r for r in returns if r < daily_rf]
+            negative_returns = returns[returns < daily_rf]
 
             if len(negative_returns) < 2:
                 return float('inf') if mean_return > daily_rf else 0.0
 
-            downside_variance = sum((r - daily_rf) ** 2 for r in negative_returns) / len(negative_returns)
+            downside_variance = float(np.mean((negative_returns - daily_rf) ** 2))
             downside_dev = math.sqrt(downside_variance) if downside_variance > 0 else 0.001
 
             daily_sortino = (mean_return - daily_rf) / downside_dev
@@ -427,8 +641,8 @@ class InstitutionalMetrics:
                 return 0.0
 
             # Calcular CAGR aproximado
-            returns = [r['return_percent'] for r in self.daily_returns]
-            total_return = sum(returns)
+            returns = self._returns.last()
+            total_return = float(returns.sum())
             days = len(returns)
 
             if days < 1:
@@ -473,14 +687,20 @@ class InstitutionalMetrics:
             if not self.latency_samples:
                 return {'p50': 0, 'p95': 0, 'p99': 0, 'avg': 0, 'samples': 0}
 
-            samples = sorted(self.latency_samples)
-            n = len(samples)
+            n = len(self.latency_samples)
+            samples = np.fromiter(self.latency_samples, dtype=np.float64, count=n)
+
+            # Selección O(N) (introselect) en lugar de ordenar todo el buffer
+            idx_p50 = int(n * 0.50)
+            idx_p95 = int(n * 0.95) if n >= 20 else n - 1
+            idx_p99 = int(n * 0.99) if n >= 100 else n - 1
+            samples.partition([idx_p50, idx_p95, idx_p99])
 
             return {
-                'p50': samples[int(n * 0.50)],
-                'p95': samples[int(n * 0.95)] if n >= 20 else samples[-1],
-                'p99': samples[int(n * 0.99)] if n >= 100 else samples[-1],
-                'avg': round(sum(samples) / n, 2),
+                'p50': float(samples[idx_p50]),
+                'p95': float(samples[idx_p95]),
+                'p99': float(samples[idx_p99]),
+                'avg': round(float(samples.sum()) / n, 2),
                 'samples': n
             }
 
@@ -530,15 +750,51 @@ class InstitutionalMetrics:
                 'slippage': self.get_slippage_stats(),
                 'fill_rate': self.get_fill_rate_stats()
             },
-            'trade_stats': {
-                'total_trades': len(self.trades),
-                'total_pnl': round(sum(t['pnl'] for t in self.trades), 2),
-                'avg_hold_time_minutes': round(
-                    sum(t['hold_time_minutes'] for t in self.trades) / len(self.trades), 1
-                ) if self.trades else 0
-            }
+            'trade_stats': self._get_trade_stats()
         }
 
+    def _get_trade_stats(self) -> Dict[str, Any]:
+        """Agrega P&L y tiempo en posición sobre las columnas de trades."""
+        with self._lock:
+            n = self._n_trades
+            if n == 0:
+                return {'total_trades': 0, 'total_pnl': 0, 'avg_hold_time_minutes': 0}
+
+            return {
+                'total_trades': n,
+                'total_pnl': round(float(self._trade_cols['pnl'][:n].sum()), 2),
+                'avg_hold_time_minutes': round(float(self._trade_cols['hold_time_minutes'][:n].mean()), 1)
+            }
+
+    # =========================================================================
+    # COLUMNAS DE TRADES (SoA)
+    # =========================================================================
+
+    def _init_trade_columns(self, capacity: int = 1024):
+        """Reserva un array contiguo por cada campo numérico de trade."""
+        self._n_trades = 0
+        self._trade_cols = {name: np.empty(capacity, dtype=np.float64) for name in TRADE_COLUMNS}
+
+    def _append_trade_columns(self, trade: TradeRec):
+        """Añade un trade a las columnas, duplicando capacidad si hace falta."""
+        n = self._n_trades
+        capacity = len(self._trade_cols['pnl'])
+        if n == capacity:
+            for name, col in self._trade_cols.items():
+                grown = np.empty(capacity * 2, dtype=col.dtype)
+                grown[:n] = col
+                self._trade_cols[name] = grown
+
+        for name in TRADE_COLUMNS:
+            self._trade_cols[name][n] = getattr(trade, name) or 0
+        self._n_trades = n + 1
+
+    def _rebuild_trade_columns(self):
+        """Reconstruye las columnas a partir de self.trades (tras cargar datos)."""
+        self._init_trade_columns(max(1024, len(self.trades)))
+        for trade in self.trades:
+            self._append_trade_columns(trade)
+
     def log_periodic_report(self, interval_name: str = "", data_logger=None):
         """
         Imprime un reporte resumido de métricas en el log.
@@ -637,7 +893,8 @@ class InstitutionalMetrics:
 
             data = {
                 'daily_returns': list(self.daily_returns),
-                'trades': self.trades[-1000:],  # Últimos 1000 trades
+                # Los trades viven en el log binario; el snapshot indica hasta dónde cubre
+                'trades_logged': self._trades_logged,
                 'regime_performance': self.regime_performance,
                 'peak_capital': self.peak_capital,
                 'current_capital': self.current_capital,
@@ -658,31 +915,215 @@ class InstitutionalMetrics:
 
     def _load_data(self):
         """Carga datos de métricas persistidos."""
-        if not os.path.exists(self.data_path):
+        try:
+            self._strings = _StringTable(self.trades_strings_path)
+        except Exception as e:
+            logger.error(f"Error cargando tabla de cadenas de trades: {e}")
+            self._strings = None
+
+        self._migrate_legacy_trade_log()
+
+        if os.path.exists(self.data_path):
+            try:
+                with open(self.data_path, 'r') as f:
+                    data = json.load(f)
+
+                self.daily_returns = deque(data.get('daily_returns', []), maxlen=MAX_DAILY_RETURNS)
+                self._returns = _ReturnBuffer(MAX_DAILY_RETURNS)
+                self._return_windows = {w: _RollingStats(w) for w in SHARPE_WINDOWS}
+                for r in self.daily_returns:
+                    self._returns.push(r['return_percent'])
+                    for stats in self._return_windows.values():
+                        stats.push(r['return_percent'])
+                self.regime_performance = data.get('regime_performance', self.regime_performance)
+                self.peak_capital = data.get('peak_capital', 0)
+                self.current_capital = data.get('current_capital', 0)
+                self.max_drawdown = data.get('max_drawdown', 0)
+                self.max_drawdown_duration_days = data.get('max_drawdown_duration_days', 0)
+
+                # v1.7: Fill rate data
+                self.limit_orders_placed = data.get('limit_orders_placed', 0)
+                self.limit_orders_filled = data.get('limit_orders_filled', 0)
+                self.limit_orders_cancelled = data.get('limit_orders_cancelled', 0)
+                self.limit_orders_timeout = data.get('limit_orders_timeout', 0)
+
+                snapshot_trades_logged = data.get('trades_logged', 0)
+
+                # Formato anterior: trades embebidos en el JSON → migrar al log binario
+                legacy_trades = data.get('trades')
+                if legacy_trades and not os.path.exists(self.trades_log_path):
+                    self._append_trade_log([TradeRec.from_dict(t) for t in legacy_trades])
+                    snapshot_trades_logged = self._trades_logged
+
+            except Exception as e:
+                logger.error(f"Error cargando métricas: {e}")
+                snapshot_trades_logged = None
+        else:
+            snapshot_trades_logged = 0
+
+        self._load_trade_log(snapshot_trades_logged)
+
+        if self.trades or self.daily_returns:
+            logger.info(f"Métricas cargadas: {len(self.trades)} trades, {len(self.daily_returns)} días")
+
+    # =========================================================================
+    # LOG BINARIO DE TRADES
+    # =========================================================================
+
+    def _append_trade_log(self, trades: List[TradeRec]):
+        """Añade trades al log binario (un write, sin re-serializar el historial)."""
+        try:
+            if self._strings is None:
+                raise RuntimeError("tabla de cadenas no disponible")
+
+            log_dir = os.path.dirname(self.trades_log_path)
+            if log_dir:
+                os.makedirs(log_dir, exist_ok=True)
+
+            text_ids = self._strings.intern([
+                '' if value is None else str(value)
+                for trade in trades
+                for value in (trade.symbol, trade.side, trade.regime, trade.agent_type)
+            ])
+
+            records = np.zeros(len(trades), dtype=TRADE_RECORD_DTYPE)
+            for i, trade in enumerate(trades):
+                try:
+                    ts = datetime.fromisoformat(trade.timestamp).timestamp()
+                except (TypeError, ValueError):
+                    ts = datetime.now().timestamp()
+                symbol_id, side_id, regime_id, agent_id = text_ids[4 * i:4 * i + 4]
+                records[i] = (
+                    int(ts * 1000),
+                    symbol_id,
+                    side_id,
+                    regime_id,
+                    agent_id,
+                    trade.pnl or 0,
+                    trade.pnl_percent or 0,
+                    trade.entry_price or 0,
+                    trade.exit_price or 0,
+                    int(trade.hold_time_minutes or 0),
+                    trade.latency_ms or 0,
+                    trade.slippage_percent or 0,
+                )
+
+            with open(self.trades_log_path, 'ab') as f:
+                records.tofile(f)
+            self._trades_logged += len(records)
+        except Exception as e:
+            logger.error(f"Error guardando trade en log binario: {e}")
+
+    def _migrate_legacy_trade_log(self):
+        """Convierte una vez el log de ancho fijo anterior al formato actual."""
+        if not os.path.exists(self.legacy_trades_log_path) or os.path.exists(self.trades_log_path):
             return
 
         try:
-            with open(self.data_path, 'r') as f:
-                data = json.load(f)
-
-            self.daily_returns = deque(data.get('daily_returns', []), maxlen=365)
-            self.trades = data.get('trades', [])
-            self.regime_performance = data.get('regime_performance', self.regime_performance)
-            self.peak_capital = data.get('peak_capital', 0)
-            self.current_capital = data.get('current_capital', 0)
-            self.max_drawdown = data.get('max_drawdown', 0)
-            self.max_drawdown_duration_days = data.get('max_drawdown_duration_days', 0)
-
-            # v1.7: Fill rate data
-            self.limit_orders_placed = data.get('limit_orders_placed', 0)
-            self.limit_orders_filled = data.get('limit_orders_filled', 0)
-            self.limit_orders_cancelled = data.get('limit_orders_cancelled', 0)
-            self.limit_orders_timeout = data.get('limit_orders_timeout', 0)
+            records = np.fromfile(self.legacy_trades_log_path, dtype=LEGACY_TRADE_RECORD_DTYPE)
+            trades = [
+                TradeRec(
+                    timestamp=datetime.fromtimestamp(int(r['ts']) / 1000).isoformat(),
+                    symbol=r['symbol'].decode('utf-8', errors='replace'),
+                    side=LEGACY_TRADE_SIDES[r['side']] if r['side'] < len(LEGACY_TRADE_SIDES) else '',
+                    pnl=float(r['pnl']),
+                    pnl_percent=float(r['pnl_percent']),
+                    entry_price=float(r['entry_price']),
+                    exit_price=float(r['exit_price']),
+                    regime=LEGACY_TRADE_REGIMES[r['regime']] if r['regime'] < len(LEGACY_TRADE_REGIMES) else 'unknown',
+                    agent_type=r['agent_type'].decode('utf-8', errors='replace'),
+                    hold_time_minutes=int(r['hold_time_minutes']),
+                    latency_ms=float(r['latency_ms']),
+                    slippage_percent=float(r['slippage_percent'])
+                )
+                for r in records
+            ]
+            if trades:
+                self._append_trade_log(trades)
+            logger.info(f"Log de trades migrado al formato actual: {len(trades)} trades")
+        except Exception as e:
+            logger.error(f"Error migrando log de trades anterior: {e}")
 
-            logger.info(f"Métricas cargadas: {len(self.trades)} trades, {len(self.daily_returns)} días")
+    def _load_trade_log(self, snapshot_trades_logged: Optional[int]):
+        """
+        Carga los últimos trades del log binario.
+
+        Los trades escritos después del último snapshot JSON se re-aplican
+        a regime_performance para no perder conteos tras un reinicio.
+        """
+        if not os.path.exists(self.trades_log_path):
+            return
+
+        try:
+            itemsize = TRADE_RECORD_DTYPE.itemsize
+            size = os.path.getsize(self.trades_log_path)
+            total = size // itemsize
+            if size % itemsize:
+                # Último registro a medias (corte durante una escritura): se
+                # descarta para que los siguientes appends queden alineados
+                logger.warning(
+                    f"Log de trades con registro incompleto ({size % itemsize} bytes): se descarta"
+                )
+                with open(self.trades_log_path, 'r+b') as f:
+                    f.truncate(total * itemsize)
+            self._trades_logged = total
+
+            # Re-aplicar trades no cubiertos por el snapshot
+            if snapshot_trades_logged is not None and snapshot_trades_logged < total:
+                self._replay_regime_performance(snapshot_trades_logged, total)
+
+            start = max(0, total - MAX_TRADES_IN_MEMORY)
+            records = np.fromfile(
+                self.trades_log_path, dtype=TRADE_RECORD_DTYPE,
+                count=total - start, offset=start * itemsize
+            )
+            self.trades = [self._record_to_trade(r) for r in records]
+            self._rebuild_trade_columns()
 
         except Exception as e:
-            logger.error(f"Error cargando métricas: {e}")
+            logger.error(f"Error cargando log de trades: {e}")
+
+    def _replay_regime_performance(self, start: int, end: int):
+        """
+        Suma a regime_performance los registros [start, end) del log.
+
+        Se lee por bloques de MAX_TRADES_IN_MEMORY registros, así un snapshot
+        muy atrasado no carga todo el log en memoria.
+        """
+        itemsize = TRADE_RECORD_DTYPE.itemsize
+        for offset in range(start, end, MAX_TRADES_IN_MEMORY):
+            chunk = np.fromfile(
+                self.trades_log_path, dtype=TRADE_RECORD_DTYPE,
+                count=min(MAX_TRADES_IN_MEMORY, end - offset), offset=offset * itemsize
+            )
+            regimes = chunk['regime']
+            for regime_id in np.unique(regimes):
+                perf = self.regime_performance.get(self._strings.get(int(regime_id)))
+                if perf is None:
+                    continue
+                pnl = chunk['pnl'][regimes == regime_id]
+                wins = int(np.count_nonzero(pnl > 0))
+                perf['wins'] += wins
+                perf['losses'] += len(pnl) - wins
+                perf['total_pnl'] += float(pnl.sum())
+
+    def _record_to_trade(self, record) -> TradeRec:
+        """Convierte un registro binario al TradeRec usado en memoria."""
+        text = self._strings.get
+        return TradeRec(
+            timestamp=datetime.fromtimestamp(int(record['ts']) / 1000).isoformat(),
+            symbol=text(int(record['symbol'])),
+            side=text(int(record['side'])),
+            pnl=float(record['pnl']),
+            pnl_percent=float(record['pnl_percent']),
+            entry_price=float(record['entry_price']),
+            exit_price=float(record['exit_price']),
+            regime=text(int(record['regime'])),
+            agent_type=text(int(record['agent_type'])),
+            hold_time_minutes=int(record['hold_time_minutes']),
+            latency_ms=float(record['latency_ms']),
+            slippage_percent=float(record['slippage_percent'])
+        )
 
 
 # =============================================================================
@@ -694,14 +1135,19 @@ _metrics_lock = threading.Lock()
 
 
 def get_institutional_metrics(config: Dict = None) -> InstitutionalMetrics:
-    """Obtiene instancia singleton de métricas institucionales."""
+    """
+    Obtiene instancia singleton de métricas institucionales.
+
+    Double-checked locking: el camino rápido es una sola lectura del global
+    (atómica bajo el GIL); el lock solo se toma en la primera llamada.
+    """
     global _metrics_instance
 
-    if _metrics_instance is not None:
-        return _metrics_instance
+    instance = _metrics_instance
+    if instance is not None:
+        return instance
 
     with _metrics_lock:
         if _metrics_instance is None:
             _metrics_instance = InstitutionalMetrics(config)
-
-    return _metrics_instance
+        return _metrics_instance
@@ -15,10 +15,11 @@ Versión: 1.7
 
 import logging
 import time
-import random
 from typing import Dict, Any, Optional, Callable
 from datetime import datetime
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,8 +33,21 @@ class PaperModeSimulator:
     Incluye latencia, slippage y fallos ocasionales.
     """
 
-    def __init__(self, config: Dict[str, Any] = None):
+    # Signo del slippage por lado (siempre desfavorable); otros lados = venta
+    SIDE_SIGN = {'buy': 1.0, 'sell': -1.0}
+
+    def __init__(
+        self,
+        config: Dict[str, Any] = None,
+        sleep_fn: Callable[[float], None] = time.sleep
+    ):
+        """
+        Args:
+            config: Configuración con sección 'paper_simulation'
+            sleep_fn: Función de espera para la latencia simulada (inyectable en tests)
+        """
         sim_config = (config or {}).get('paper_simulation', {})
+        self._sleep = sleep_fn
 
         # Latencia de red (ms)
         self.min_latency_ms = sim_config.get('min_latency_ms', 50)
@@ -46,6 +60,15 @@ class PaperModeSimulator:
         # Probabilidad de fallos
         self.failure_rate = sim_config.get('failure_rate', 0.02)  # 2% de fallos
 
+        # Constantes derivadas (precalculadas una vez, no en cada orden)
+        self._lat_min = float(self.min_latency_ms)
+        self._lat_span = float(self.max_latency_ms - self.min_latency_ms)
+        self._slip_base = float(self.base_slippage_percent)
+        self._slip_span = float(self.max_slippage_percent - self.base_slippage_percent)
+
+        # Generador PCG64 único para órdenes individuales y en lote (reproducible con 'seed')
+        self._rng = np.random.default_rng(sim_config.get('seed'))
+
         # Estadísticas
         self.stats = {
             'total_orders': 0,
@@ -56,8 +79,8 @@ class PaperModeSimulator:
 
     def simulate_latency(self):
         """Simula latencia de red."""
-        latency_ms = random.uniform(self.min_latency_ms, self.max_latency_ms)
-        time.sleep(latency_ms / 1000)
+        latency_ms = self._lat_min + self._rng.random() * self._lat_span
+        self._sleep(latency_ms / 1000)
         self.stats['total_latency_ms'] += latency_ms
         return latency_ms
 
@@ -74,16 +97,14 @@ class PaperModeSimulator:
             Precio ajustado con slippage
         """
         # Slippage base + componente aleatorio
-        slippage_percent = self.base_slippage_percent + random.uniform(0, self.max_slippage_percent - self.base_slippage_percent)
+        slippage_percent = self._slip_base + self._rng.random() * self._slip_span
 
         # Ajustar por volatilidad
         slippage_percent *= volatility
 
-        # Dirección del slippage (siempre desfavorable)
-        if side == 'buy':
-            adjusted_price = price * (1 + slippage_percent / 100)
-        else:
-            adjusted_price = price * (1 - slippage_percent / 100)
+        # Dirección del slippage (siempre desfavorable), sin bifurcación por lado
+        sign = self.SIDE_SIGN.get(side, -1.0)
+        adjusted_price = price * (1 + sign * slippage_percent / 100)
 
         slippage_usd = abs(adjusted_price - price)
         self.stats['total_slippage_usd'] += slippage_usd
@@ -92,7 +113,7 @@ class PaperModeSimulator:
 
     def should_fail(self) -> bool:
         """Determina si la orden debe fallar (simula problemas de red)."""
-        if random.random() < self.failure_rate:
+        if self._rng.random() < self.failure_rate:
             self.stats['failures'] += 1
             return True
         return False
@@ -131,6 +152,59 @@ class PaperModeSimulator:
             'latency_ms': latency
         }
 
+    def process_orders_batch(
+        self,
+        prices: np.ndarray,
+        sides: np.ndarray,
+        order_type: str = 'market'
+    ) -> Dict[str, np.ndarray]:
+        """
+        Procesa N órdenes de una vez (para backtests / Monte Carlo).
+
+        Misma lógica que process_order, pero sin sleep de latencia y con
+        todas las muestras aleatorias generadas en llamadas vectorizadas.
+
+        Args:
+            prices: Precios objetivo (N,)
+            sides: Lados 'buy'/'sell' (N,)
+            order_type: Tipo de orden para todo el lote
+
+        Returns:
+            Dict de arrays: success, executed_price, slippage_percent, latency_ms.
+            Las órdenes fallidas tienen executed_price y slippage_percent NaN.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        sides = np.asarray(sides)
+        n = prices.shape[0]
+        rng = self._rng
+
+        latency_ms = rng.uniform(self.min_latency_ms, self.max_latency_ms, n)
+        failed = rng.random(n) < self.failure_rate
+
+        if order_type == 'market':
+            sign = np.where(sides == 'buy', 1.0, -1.0)
+            slippage = rng.uniform(self.base_slippage_percent, self.max_slippage_percent, n)
+            executed = prices * (1 + sign * slippage / 100)
+        else:
+            executed = prices.copy()
+
+        executed[failed] = np.nan
+        slippage_percent = np.abs(executed - prices) / prices * 100
+
+        # Estadísticas acumuladas (mismas que en process_order)
+        self.stats['total_orders'] += n
+        self.stats['total_latency_ms'] += float(latency_ms.sum())
+        self.stats['failures'] += int(failed.sum())
+        if order_type == 'market':
+            self.stats['total_slippage_usd'] += float(np.nansum(np.abs(executed - prices)))
+
+        return {
+            'success': ~failed,
+            'executed_price': executed,
+            'slippage_percent': slippage_percent,
+            'latency_ms': latency_ms
+        }
+
     def get_stats(self) -> Dict[str, Any]:
         """Retorna estadísticas de simulación."""
         total = self.stats['total_orders']
@@ -24,25 +24,132 @@ import logging
 from typing import Dict, Any, Optional
 from datetime import datetime
 import json
+import math
 import os
 import sqlite3
 from contextlib import contextmanager
+from functools import lru_cache
 import threading
 
+# JIT opcional para el cálculo de probabilidad Kelly
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Fallback sin Numba: devuelve la función sin compilar."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
 logger = logging.getLogger(__name__)
 
 
+@njit(cache=True)
+def _kelly_probability(confidence: float, wins: int, losses: int, recent_loss_streak: int) -> float:
+    """
+    Núcleo numérico de RiskManager._adjust_confidence_to_probability.
+
+    Función pura sobre primitivos para poder compilarse con Numba.
+
+    Args:
+        confidence: Confianza reportada por la IA (0-1)
+        wins: Trades ganadores en el historial
+        losses: Trades perdedores en el historial
+        recent_loss_streak: Pérdidas consecutivas recientes
+
+    Returns:
+        Probabilidad ajustada
+    """
+    total_trades = wins + losses
+    historical_win_rate = wins / total_trades if total_trades > 0 else 0.50
+
+    if total_trades < 10:
+        # Menos de 10 trades: probabilidad neutral
+        return 0.50
+
+    if total_trades < 30:
+        # Entre 10-30 trades: blend conservador
+        weight = (total_trades - 10) / 20
+        blended = 0.48 * (1 - weight) + historical_win_rate * weight
+        return max(0.35, min(blended, 0.65))
+
+    if total_trades < 50:
+        # Entre 30-50 trades: blend moderado
+        weight = (total_trades - 30) / 20
+        blended = 0.50 * (1 - weight) + historical_win_rate * weight
+        return max(0.30, min(blended, 0.70))
+
+    # 50+ trades: ajustar confianza usando historial
+    historical_factor = max(0.6, min(historical_win_rate / 0.50, 1.4))
+    adjusted_probability = confidence * historical_factor
+
+    # Factor de seguridad por racha perdedora
+    if recent_loss_streak >= 3:
+        adjusted_probability *= max(0.7, 1 - (recent_loss_streak - 2) * 0.1)
+
+    return max(0.25, min(adjusted_probability, 0.80))
+
+
+# Memoización del núcleo: confianza cuantizada y contadores cambian poco entre llamadas
+_kelly_probability_cached = lru_cache(maxsize=1024)(_kelly_probability)
+
+# Bitmask de resultados recientes: bit 1 = no pérdida, bit 0 = pérdida (LSB = más reciente)
+RECENT_RESULTS_BITS = 64
+RECENT_RESULTS_MASK = (1 << RECENT_RESULTS_BITS) - 1
+
+# PRAGMAs SQLite por defecto: WAL + synchronous NORMAL evita un fsync por commit
+DEFAULT_SQLITE_PRAGMAS = {'journal_mode': 'WAL', 'synchronous': 'NORMAL'}
+
+
+def hour_range_lookup(hour_ranges) -> tuple:
+    """
+    Tabla de 24 entradas: para cada hora UTC, el primer rango [inicio, fin) que
+    la contiene, o None.
+
+    Una hora entera h está en el rango si inicio <= h < fin, es decir
+    ceil(inicio) <= h < ceil(fin); así un rango fraccionario como [7.5, 16]
+    no marca las 07:xx, igual que la comparación directa.
+    """
+    table = [None] * 24
+    for start_hour, end_hour in hour_ranges:
+        for hour in range(max(0, math.ceil(start_hour)), min(24, math.ceil(end_hour))):
+            if table[hour] is None:
+                table[hour] = (start_hour, end_hour)
+    return tuple(table)
+
+
+def hours_to_mask(hour_ranges) -> int:
+    """
+    Compila rangos horarios [inicio, fin) a una máscara de 24 bits (bit h = hora h UTC).
+
+    Rangos vacíos o invertidos no marcan ninguna hora, igual que la comparación
+    start <= hour < end que reemplazan.
+    """
+    mask = 0
+    for hour, hour_range in enumerate(hour_range_lookup(hour_ranges)):
+        if hour_range is not None:
+            mask |= 1 << hour
+    return mask
+
+
 class RiskManager:
     """
     Gestor de riesgo que valida y controla todas las operaciones de trading.
     """
 
-    def __init__(self, config: Dict[str, Any]):
+    # v2.2: Tablas que crea _init_database
+    SCHEMA_TABLES = ('risk_state', 'trade_history_kelly', 'recent_results', 'open_trades')
+
+    def __init__(self, config: Dict[str, Any], db_path: str = 'data/risk_manager.db'):
         """
         Inicializa el gestor de riesgo.
 
         Args:
             config: Configuración de gestión de riesgo
+            db_path: Ruta de la base de datos SQLite de estado
         """
         self.config = config.get('risk_management', {})
         self.trading_config = config.get('trading', {})
@@ -114,11 +221,25 @@ class RiskManager:
         # v1.8: Session filter para horarios óptimos
         session_config = self.config.get('session_filter', {})
         self.use_session_filter = session_config.get('enabled', False)
+        # El setter precompila la tabla hora -> rango usada por is_optimal_session
         self.optimal_hours_utc = session_config.get('optimal_hours_utc', [[7, 16], [13, 22]])  # Europa y USA
 
         # v2.2: Inicializar base de datos SQLite para persistencia atómica
-        self.db_path = 'data/risk_manager.db'
-        self._db_lock = threading.Lock()
+        self.db_path = db_path
+        # v2.2: PRAGMAs configurables (ej. journal_mode=MEMORY en tests)
+        self.sqlite_pragmas = {
+            **DEFAULT_SQLITE_PRAGMAS,
+            **self.config.get('sqlite_pragmas', {})
+        }
+        for name, value in self.sqlite_pragmas.items():
+            if not str(name).isidentifier() or not str(value).replace('-', '').isalnum():
+                raise ValueError(f"PRAGMA SQLite inválido: {name}={value}")
+        # ':memory:' necesita una única conexión viva (cada connect() crea una DB vacía)
+        self._memory_conn = (
+            sqlite3.connect(':memory:', check_same_thread=False) if db_path == ':memory:' else None
+        )
+        # Reentrante: record_trade_result llama a _save_state con el lock tomado
+        self._db_lock = threading.RLock()
         self._init_database()
 
         # Cargar estado si existe
@@ -489,6 +610,17 @@ class RiskManager:
         logger.info(f"🎯 ATR-based TP: Distance={tp_distance_percent:.2f}%, R/R={rr_ratio}:1")
         return take_profit
 
+    @property
+    def optimal_hours_utc(self):
+        """Rangos [inicio, fin) UTC de sesión óptima."""
+        return self._optimal_hours_utc
+
+    @optimal_hours_utc.setter
+    def optimal_hours_utc(self, hour_ranges):
+        # Reasignar la lista recompila la tabla (mutarla in-place no)
+        self._optimal_hours_utc = hour_ranges
+        self._optimal_hour_lookup = hour_range_lookup(hour_ranges)
+
     def is_optimal_session(self) -> Dict[str, Any]:
         """
         v1.8 INSTITUCIONAL: Verifica si estamos en una sesión de trading óptima.
@@ -516,14 +648,15 @@ class RiskManager:
                 'day': current_day
             }
 
-        # Verificar si estamos en horario óptimo
-        for start_hour, end_hour in self.optimal_hours_utc:
-            if start_hour <= current_hour < end_hour:
-                return {
-                    'optimal': True,
-                    'reason': f'Sesión activa ({start_hour}:00-{end_hour}:00 UTC)',
-                    'hour_utc': current_hour
-                }
+        # Verificar si estamos en horario óptimo (tabla precompilada hora -> rango)
+        session = self._optimal_hour_lookup[current_hour]
+        if session is not None:
+            start_hour, end_hour = session
+            return {
+                'optimal': True,
+                'reason': f'Sesión activa ({start_hour}:00-{end_hour}:00 UTC)',
+                'hour_utc': current_hour
+            }
 
         return {
             'optimal': False,
@@ -699,7 +832,12 @@ class RiskManager:
         v2.2: Context manager para conexiones SQLite thread-safe.
         Garantiza transacciones atómicas - si algo falla, se hace rollback.
         """
-        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn = self._memory_conn
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            # Los PRAGMAs son por conexión (salvo WAL, que persiste en el archivo)
+            for name, value in self.sqlite_pragmas.items():
+                conn.execute(f"PRAGMA {name}={value}")
         conn.row_factory = sqlite3.Row
         try:
             yield conn
@@ -708,14 +846,17 @@ class RiskManager:
             conn.rollback()
             raise e
         finally:
-            conn.close()
+            if conn is not self._memory_conn:
+                conn.close()
 
     def _init_database(self):
         """
         v2.2: Inicializa la base de datos SQLite para persistencia atómica.
         Reemplaza el archivo JSON que era vulnerable a corrupción.
         """
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir and self._memory_conn is None:
+            os.makedirs(db_dir, exist_ok=True)
 
         with self._db_lock:
             with self._get_connection() as conn:
@@ -775,6 +916,13 @@ class RiskManager:
 
                 logger.debug("Base de datos SQLite para Risk Manager inicializada")
 
+    def list_tables(self) -> list:
+        """Lista las tablas existentes en la base de datos del Risk Manager."""
+        with self._db_lock:
+            with self._get_connection() as conn:
+                cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+                return [row[0] for row in cursor.fetchall()]
+
     def _save_state(self):
         """
         v2.2 INSTITUCIONAL: Guarda el estado en SQLite con transacción atómica.
@@ -878,8 +1026,8 @@ class RiskManager:
                         SELECT result FROM recent_results
                         ORDER BY created_at DESC LIMIT 20
                     """)
-                    self.recent_results = [row['result'] for row in cursor.fetchall()]
-                    self.recent_results.reverse()  # Orden cronológico
+                    # Orden cronológico
+                    self.recent_results = [row['result'] for row in cursor.fetchall()][::-1]
 
                 # Log del estado cargado
                 total_trades = self.trade_history['wins'] + self.trade_history['losses']
@@ -902,8 +1050,14 @@ class RiskManager:
         v2.2: Migra datos del archivo JSON antiguo a SQLite (una sola vez).
         Preserva el historial de Kelly y capital existente.
         """
-        json_file = 'data/risk_manager_state.json'
-        migrated_flag = 'data/.risk_manager_migrated'
+        # DB en memoria: no hay datos legacy que migrar
+        if self._memory_conn is not None:
+            return
+
+        # Los archivos legacy viven junto a la base de datos
+        data_dir = os.path.dirname(self.db_path) or '.'
+        json_file = os.path.join(data_dir, 'risk_manager_state.json')
+        migrated_flag = os.path.join(data_dir, '.risk_manager_migrated')
 
         # Si ya migramos, no hacer nada
         if os.path.exists(migrated_flag):
@@ -1087,51 +1241,24 @@ class RiskManager:
         Returns:
             Probabilidad ajustada
         """
-        # Obtener win rate histórico
-        historical_win_rate = self._get_win_rate()
-        total_trades = self.trade_history['wins'] + self.trade_history['losses']
+        wins = int(self.trade_history['wins'])
+        losses = int(self.trade_history['losses'])
+        total_trades = wins + losses
+        recent_losses = self._get_recent_loss_streak()
+
+        # v2.3: Cálculo delegado al núcleo puro (compilado con Numba si está disponible)
+        # Confianza cuantizada a 3 decimales para maximizar aciertos de caché
+        probability = _kelly_probability_cached(round(float(confidence), 3), wins, losses, recent_losses)
 
-        # v1.7.1: Ajustado para permitir operaciones iniciales
-        # Ser conservador pero no tan restrictivo que impida operar
         if total_trades < 10:
-            # Menos de 10 trades: usar probabilidad conservadora pero viable
-            # 0.50 permite operaciones con Kelly positivo cuando R/R >= 2
             logger.info(f"Kelly: Solo {total_trades} trades - usando probabilidad base 0.50")
-            return 0.50  # Neutral - permite operar si R/R es bueno
-
-        elif total_trades < 30:
-            # Entre 10-30 trades: blend conservador
-            base_probability = 0.48
-            weight = (total_trades - 10) / 20  # 0 a 1 entre 10 y 30 trades
-            blended = base_probability * (1 - weight) + historical_win_rate * weight
-            logger.debug(f"Kelly: {total_trades} trades - blend probability {blended:.2f}")
-            return max(0.35, min(blended, 0.65))  # Limitar más estrictamente
-
         elif total_trades < 50:
-            # Entre 30-50 trades: blend moderado
-            base_probability = 0.50
-            weight = (total_trades - 30) / 20
-            blended = base_probability * (1 - weight) + historical_win_rate * weight
-            logger.debug(f"Kelly: {total_trades} trades - moderate blend {blended:.2f}")
-            return max(0.30, min(blended, 0.70))
-
-        # 50+ trades: confiar más en historial real
-        # Ajustar confianza usando historial
-        historical_factor = historical_win_rate / 0.50  # Normalizado a 50%
-        historical_factor = max(0.6, min(historical_factor, 1.4))  # v1.7: Rango más estrecho
-
-        adjusted_probability = confidence * historical_factor
-
-        # v1.7: Aplicar factor de seguridad adicional basado en drawdown reciente
-        recent_losses = self._get_recent_loss_streak()
-        if recent_losses >= 3:
-            # Reducir probabilidad si hay racha perdedora
+            logger.debug(f"Kelly: {total_trades} trades - blend probability {probability:.2f}")
+        elif recent_losses >= 3:
             safety_factor = max(0.7, 1 - (recent_losses - 2) * 0.1)
-            adjusted_probability *= safety_factor
             logger.info(f"Kelly: {recent_losses} pérdidas recientes - factor seguridad {safety_factor:.2f}")
 
-        # Limitar entre 0.25 y 0.80 (nunca demasiado extremo)
-        return max(0.25, min(adjusted_probability, 0.80))
+        return probability
 
     def _get_recent_loss_streak(self) -> int:
         """
@@ -1145,15 +1272,28 @@ class RiskManager:
         if not hasattr(self, 'recent_results'):
             self.recent_results = []
 
-        # Contar pérdidas consecutivas desde el final
-        streak = 0
-        for result in reversed(self.recent_results[-10:]):  # Últimos 10 trades
-            if result == 'loss':
-                streak += 1
-            else:
-                break
-
-        return streak
+        # Pérdidas consecutivas = ceros finales del bitmask (últimos 10 trades)
+        mask = self._recent_mask
+        trailing_losses = (mask & -mask).bit_length() - 1 if mask else self._recent_len
+        return min(trailing_losses, self._recent_len, 10)
+
+    @property
+    def recent_results(self) -> list:
+        """Resultados recientes ('win'/'loss') en orden cronológico."""
+        return self._recent_results
+
+    @recent_results.setter
+    def recent_results(self, results):
+        self._recent_results = list(results)
+        self._recent_mask = 0
+        self._recent_len = 0
+        for result in self._recent_results[-RECENT_RESULTS_BITS:]:
+            self._push_recent_bit(result != 'loss')
+
+    def _push_recent_bit(self, is_win: bool):
+        """Desplaza un resultado al bitmask de resultados recientes."""
+        self._recent_mask = ((self._recent_mask << 1) | int(is_win)) & RECENT_RESULTS_MASK
+        self._recent_len = min(self._recent_len + 1, RECENT_RESULTS_BITS)
 
     def record_trade_result(self, is_win: bool, pnl: float = 0):
         """
@@ -1174,6 +1314,7 @@ class RiskManager:
 
         result = 'win' if is_win else 'loss'
         self.recent_results.append(result)
+        self._push_recent_bit(is_win)
 
         # Mantener solo los últimos 20 resultados en memoria
         if len(self.recent_results) > 20:
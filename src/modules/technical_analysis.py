@@ -158,6 +158,25 @@ class TechnicalAnalyzer:
             logger.error(f"Error en análisis técnico: {e}")
             return {}
 
+    def adx_only(self, ohlcv_data: List[List]) -> Dict[str, Any]:
+        """
+        v2.2: Calcula solo el ADX, como pre-filtro barato antes de analyze().
+
+        Args:
+            ohlcv_data: Lista de velas [timestamp, open, high, low, close, volume]
+
+        Returns:
+            Diccionario con las claves adx_* (vacío si no hay velas suficientes)
+        """
+        if not ohlcv_data or len(ohlcv_data) < self.absolute_min_candles:
+            return {}
+
+        try:
+            return self._calculate_adx(self._create_dataframe(ohlcv_data))
+        except Exception as e:
+            logger.error(f"Error calculando ADX: {e}")
+            return {}
+
     def _create_dataframe(self, ohlcv_data: List[List]) -> pd.DataFrame:
         """
         Convierte datos OHLCV a DataFrame de pandas.
@@ -0,0 +1,75 @@
+"""
+Configuración compartida de pytest.
+
+src/ se añade al path vía `pythonpath` en pytest.ini (raíz del repo).
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+import yaml
+
+# Loader en C (LibYAML) si está disponible; fallback al SafeLoader puro Python
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+CONFIG_PAPER = ROOT_DIR / 'config' / 'config_paper.yaml'
+
+# Caché JSON de configs parseadas (fuera del repo para no ensuciar config/)
+CONFIG_CACHE_DIR = Path(tempfile.gettempdir()) / 'sath-test-config-cache'
+
+
+def _load_config_cached(path: Path) -> dict:
+    """
+    Carga un YAML usando un sidecar JSON invalidado por mtime/tamaño.
+
+    Entre ejecuciones, si el YAML no cambió, basta con json.load.
+    """
+    stat = path.stat()
+    key = [stat.st_mtime_ns, stat.st_size]
+    path_id = hashlib.sha1(str(path).encode()).hexdigest()[:12]
+    cache_path = CONFIG_CACHE_DIR / f"{path.stem}-{path_id}.cache.json"
+
+    try:
+        with open(cache_path, 'r') as f:
+            cached = json.load(f)
+        if cached.get('key') == key:
+            return cached['data']
+    except (OSError, ValueError):
+        pass
+
+    with open(path, 'r') as f:
+        data = yaml.load(f, Loader=_YamlLoader)
+
+    # Solo se cachea si JSON preserva el contenido (p.ej. sin claves numéricas ni fechas)
+    try:
+        payload = json.dumps({'key': key, 'data': data})
+        if json.loads(payload)['data'] != data:
+            return data
+    except (TypeError, ValueError):
+        return data
+
+    # Escritura atómica: archivo temporal + rename
+    try:
+        CONFIG_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=CONFIG_CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            f.write(payload)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+    return data
+
+
+@pytest.fixture(scope="session")
+def paper_config():
+    """config_paper.yaml parseado una sola vez por sesión (solo lectura)."""
+    return _load_config_cached(CONFIG_PAPER)
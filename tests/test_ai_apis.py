@@ -8,13 +8,78 @@ antes de ejecutar el bot de trading.
 
 import os
 import sys
+import random
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import OpenAI, RateLimitError
 import time
 
 # Cargar variables de entorno
 load_dotenv()
 
+# Claves leídas una sola vez tras cargar .env
+DEEPSEEK_KEY = os.getenv('DEEPSEEK_API_KEY')
+OPENAI_KEY = os.getenv('OPENAI_API_KEY')
+
+# Endpoints por proveedor (api_key, base_url)
+AI_PROVIDERS = {
+    'deepseek': (DEEPSEEK_KEY, "https://api.deepseek.com"),
+    'openai': (OPENAI_KEY, "https://api.openai.com/v1"),
+}
+
+# Cliente base compartido (un único pool de conexiones HTTP)
+_shared_client = None
+
+# Reintentos ante rate limit (HTTP 429)
+MAX_RATE_LIMIT_RETRIES = 3
+
+# Prompts de prueba (constantes de módulo)
+DEEPSEEK_TEST_PROMPT = """
+Eres un analista financiero experto. Responde en formato JSON:
+
+Pregunta: ¿Cuál es la señal si el RSI está en 25 y el precio está por encima de la EMA 200?
+
+Responde en este formato JSON:
+{
+    "señal": "COMPRA o VENTA o ESPERA",
+    "razonamiento": "explicación breve"
+}
+"""
+
+OPENAI_TEST_PROMPT = """
+Eres un analista financiero experto. Responde en formato JSON:
+
+Pregunta: Si el MACD cruza por encima de la señal y el volumen aumenta, ¿qué indica?
+
+Responde en este formato JSON:
+{
+    "señal": "COMPRA o VENTA o ESPERA",
+    "razonamiento": "explicación breve"
+}
+"""
+
+# Plantilla del análisis de mercado (se rellena con .format(**market_data))
+MARKET_PROMPT_TMPL = """
+Actúa como un trader institucional profesional.
+
+Analiza estos datos del mercado BTC/USDT:
+- Precio actual: ${current_price}
+- RSI (14): {rsi} (sobrevendido: <30)
+- EMA 50: ${ema_50}
+- EMA 200: ${ema_200}
+- MACD: {macd} (Señal: {macd_signal})
+- Tendencia: {trend}
+- Volatilidad: {volatility}
+
+Responde SOLO en formato JSON:
+{{
+    "decision": "COMPRA" | "VENTA" | "ESPERA",
+    "confidence": 0.0-1.0,
+    "razonamiento": "explicación técnica breve",
+    "stop_loss_sugerido": precio_numérico,
+    "take_profit_sugerido": precio_numérico
+}}
+"""
+
 # Colores para terminal
 class Colors:
     GREEN = '\033[92m'
@@ -33,24 +98,76 @@ def print_header(text):
     print(f"{Colors.CYAN}{Colors.BOLD}{'='*70}{Colors.RESET}\n")
 
 
+# Prefijos con color precalculados para los helpers de impresión
+_OK_PREFIX = f"{Colors.GREEN}✅ "
+_ERR_PREFIX = f"{Colors.RED}❌ "
+_WARN_PREFIX = f"{Colors.YELLOW}⚠️  "
+_INFO_PREFIX = f"{Colors.BLUE}ℹ️  "
+
+
 def print_success(text):
     """Imprime mensaje de éxito."""
-    print(f"{Colors.GREEN}✅ {text}{Colors.RESET}")
+    print(_OK_PREFIX, text, Colors.RESET, sep='')
 
 
 def print_error(text):
     """Imprime mensaje de error."""
-    print(f"{Colors.RED}❌ {text}{Colors.RESET}")
+    print(_ERR_PREFIX, text, Colors.RESET, sep='')
 
 
 def print_warning(text):
     """Imprime mensaje de advertencia."""
-    print(f"{Colors.YELLOW}⚠️  {text}{Colors.RESET}")
+    print(_WARN_PREFIX, text, Colors.RESET, sep='')
 
 
 def print_info(text):
     """Imprime mensaje informativo."""
-    print(f"{Colors.BLUE}ℹ️  {text}{Colors.RESET}")
+    print(_INFO_PREFIX, text, Colors.RESET, sep='')
+
+
+def get_ai_client(provider):
+    """
+    Devuelve un cliente OpenAI para el proveedor indicado.
+
+    El primer cliente creado se reutiliza para el resto de proveedores
+    mediante with_options(), que comparte el mismo httpx.Client.
+    """
+    global _shared_client
+
+    api_key, base_url = AI_PROVIDERS[provider]
+
+    if _shared_client is None:
+        _shared_client = OpenAI(api_key=api_key, base_url=base_url)
+        return _shared_client
+
+    return _shared_client.with_options(api_key=api_key, base_url=base_url)
+
+
+def create_completion_with_backoff(client, **kwargs):
+    """
+    Llama a chat.completions.create reintentando ante HTTP 429.
+
+    Usa backoff exponencial (1s, 2s, 4s) con jitter de ±25%, respetando
+    el header Retry-After cuando el servidor lo envía.
+    """
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        try:
+            return client.chat.completions.create(**kwargs)
+        except RateLimitError as e:
+            if attempt == MAX_RATE_LIMIT_RETRIES:
+                raise
+
+            delay = (2 ** attempt) * (0.75 + 0.5 * random.random())
+            retry_after = e.response.headers.get('retry-after') if e.response is not None else None
+            if retry_after:
+                try:
+                    delay = float(retry_after)
+                except ValueError:
+                    pass
+
+            print_warning(f"Rate limit (429), reintentando en {delay:.1f}s "
+                          f"({attempt + 1}/{MAX_RATE_LIMIT_RETRIES})")
+            time.sleep(delay)
 
 
 def test_deepseek():
@@ -59,7 +176,7 @@ def test_deepseek():
     """
     print_header("PRUEBA DE DEEPSEEK API")
 
-    api_key = os.getenv('DEEPSEEK_API_KEY')
+    api_key = DEEPSEEK_KEY
 
     if not api_key:
         print_error("DEEPSEEK_API_KEY no encontrada en .env")
@@ -70,29 +187,14 @@ def test_deepseek():
 
     try:
         # Inicializar cliente
-        client = OpenAI(
-            api_key=api_key,
-            base_url="https://api.deepseek.com"
-        )
+        client = get_ai_client('deepseek')
 
         print_info("Enviando petición de prueba a DeepSeek...")
 
-        # Prompt de prueba relacionado con trading
-        test_prompt = """
-Eres un analista financiero experto. Responde en formato JSON:
-
-Pregunta: ¿Cuál es la señal si el RSI está en 25 y el precio está por encima de la EMA 200?
-
-Responde en este formato JSON:
-{
-    "señal": "COMPRA o VENTA o ESPERA",
-    "razonamiento": "explicación breve"
-}
-"""
-
         start_time = time.time()
 
-        response = client.chat.completions.create(
+        response = create_completion_with_backoff(
+            client,
             model="deepseek-chat",
             messages=[
                 {
@@ -101,7 +203,7 @@ Responde en este formato JSON:
                 },
                 {
                     "role": "user",
-                    "content": test_prompt
+                    "content": DEEPSEEK_TEST_PROMPT
                 }
             ],
             temperature=0.1,
@@ -146,7 +248,7 @@ def test_openai():
     """
     print_header("PRUEBA DE OPENAI API")
 
-    api_key = os.getenv('OPENAI_API_KEY')
+    api_key = OPENAI_KEY
 
     if not api_key:
         print_error("OPENAI_API_KEY no encontrada en .env")
@@ -157,26 +259,14 @@ def test_openai():
 
     try:
         # Inicializar cliente
-        client = OpenAI(api_key=api_key)
+        client = get_ai_client('openai')
 
         print_info("Enviando petición de prueba a OpenAI...")
 
-        # Prompt de prueba relacionado con trading
-        test_prompt = """
-Eres un analista financiero experto. Responde en formato JSON:
-
-Pregunta: Si el MACD cruza por encima de la señal y el volumen aumenta, ¿qué indica?
-
-Responde en este formato JSON:
-{
-    "señal": "COMPRA o VENTA o ESPERA",
-    "razonamiento": "explicación breve"
-}
-"""
-
         start_time = time.time()
 
-        response = client.chat.completions.create(
+        response = create_completion_with_backoff(
+            client,
             model="gpt-4o-mini",  # Modelo más económico para pruebas
             messages=[
                 {
@@ -185,7 +275,7 @@ Responde en este formato JSON:
                 },
                 {
                     "role": "user",
-                    "content": test_prompt
+                    "content": OPENAI_TEST_PROMPT
                 }
             ],
             temperature=0.1,
@@ -231,8 +321,8 @@ def test_market_analysis_simulation():
     print_header("SIMULACIÓN DE ANÁLISIS DE MERCADO")
 
     # Determinar qué API usar
-    deepseek_key = os.getenv('DEEPSEEK_API_KEY')
-    openai_key = os.getenv('OPENAI_API_KEY')
+    deepseek_key = DEEPSEEK_KEY
+    openai_key = OPENAI_KEY
 
     if not deepseek_key and not openai_key:
         print_error("No hay ninguna API configurada")
@@ -241,15 +331,12 @@ def test_market_analysis_simulation():
     # Preferir DeepSeek (más económico)
     if deepseek_key:
         provider = "deepseek"
-        client = OpenAI(
-            api_key=deepseek_key,
-            base_url="https://api.deepseek.com"
-        )
+        client = get_ai_client('deepseek')
         model = "deepseek-chat"
         print_info("Usando DeepSeek para la simulación")
     else:
         provider = "openai"
-        client = OpenAI(api_key=openai_key)
+        client = get_ai_client('openai')
         model = "gpt-4o-mini"
         print_info("Usando OpenAI para la simulación")
 
@@ -266,27 +353,7 @@ def test_market_analysis_simulation():
         "volatility": "media"
     }
 
-    prompt = f"""
-Actúa como un trader institucional profesional.
-
-Analiza estos datos del mercado BTC/USDT:
-- Precio actual: ${market_data['current_price']}
-- RSI (14): {market_data['rsi']} (sobrevendido: <30)
-- EMA 50: ${market_data['ema_50']}
-- EMA 200: ${market_data['ema_200']}
-- MACD: {market_data['macd']} (Señal: {market_data['macd_signal']})
-- Tendencia: {market_data['trend']}
-- Volatilidad: {market_data['volatility']}
-
-Responde SOLO en formato JSON:
-{{
-    "decision": "COMPRA" | "VENTA" | "ESPERA",
-    "confidence": 0.0-1.0,
-    "razonamiento": "explicación técnica breve",
-    "stop_loss_sugerido": precio_numérico,
-    "take_profit_sugerido": precio_numérico
-}}
-"""
+    prompt = MARKET_PROMPT_TMPL.format(**market_data)
 
     try:
         print_info("Analizando datos de mercado simulados...")
@@ -294,30 +361,70 @@ Responde SOLO en formato JSON:
         for key, value in market_data.items():
             print(f"  • {key}: {value}")
 
+        messages = [
+            {
+                "role": "system",
+                "content": "Eres un trader experto que analiza mercados y responde siempre en formato JSON válido."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+
         start_time = time.time()
+        first_token_time = None
+        usage = None
 
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "Eres un trader experto que analiza mercados y responde siempre en formato JSON válido."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=0.1,
-            max_tokens=500
-        )
+        print(f"\n{Colors.BOLD}{Colors.GREEN}Decisión de Trading:{Colors.RESET}")
+
+        try:
+            # Streaming: la respuesta se imprime a medida que llega
+            stream = client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0.1,
+                max_tokens=500,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+
+            chunks = []
+            print(Colors.CYAN, end='', flush=True)
+            for chunk in stream:
+                if not chunk.choices:
+                    usage = chunk.usage  # Chunk final con usage
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if first_token_time is None:
+                        first_token_time = time.time() - start_time
+                    chunks.append(delta)
+                    print(delta, end='', flush=True)
+            print(Colors.RESET)
+            content = ''.join(chunks)
+
+        except Exception as stream_error:
+            # Fallback: petición sin streaming
+            print(Colors.RESET)
+            print_warning(f"Streaming no disponible ({stream_error}), usando respuesta completa")
+            response = client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0.1,
+                max_tokens=500
+            )
+            content = response.choices[0].message.content
+            usage = response.usage
+            print(f"{Colors.CYAN}{content}{Colors.RESET}")
 
         elapsed_time = time.time() - start_time
-        content = response.choices[0].message.content
 
         print_success(f"Análisis completado en {elapsed_time:.2f}s")
-        print(f"\n{Colors.BOLD}{Colors.GREEN}Decisión de Trading:{Colors.RESET}")
-        print(f"{Colors.CYAN}{content}{Colors.RESET}")
+        if first_token_time is not None:
+            print_info(f"Primer token en {first_token_time:.2f}s")
+        if usage is not None:
+            print_info(f"Tokens usados: {usage.total_tokens}")
 
         # Intentar parsear el JSON
         import json
@@ -368,13 +475,13 @@ def main():
     print_info("Archivo .env encontrado")
 
     # Test DeepSeek
-    if os.getenv('DEEPSEEK_API_KEY'):
+    if DEEPSEEK_KEY:
         results['deepseek'] = test_deepseek()
     else:
         print_warning("DeepSeek API Key no configurada - saltando prueba")
 
     # Test OpenAI
-    if os.getenv('OPENAI_API_KEY'):
+    if OPENAI_KEY:
         results['openai'] = test_openai()
     else:
         print_warning("OpenAI API Key no configurada - saltando prueba")
@@ -388,12 +495,12 @@ def main():
 
     print(f"\n{Colors.BOLD}Resultados:{Colors.RESET}")
 
-    if os.getenv('DEEPSEEK_API_KEY'):
+    if DEEPSEEK_KEY:
         status = "✅ FUNCIONANDO" if results['deepseek'] else "❌ ERROR"
         color = Colors.GREEN if results['deepseek'] else Colors.RED
         print(f"  DeepSeek API:    {color}{status}{Colors.RESET}")
 
-    if os.getenv('OPENAI_API_KEY'):
+    if OPENAI_KEY:
         status = "✅ FUNCIONANDO" if results['openai'] else "❌ ERROR"
         color = Colors.GREEN if results['openai'] else Colors.RED
         print(f"  OpenAI API:      {color}{status}{Colors.RESET}")
@@ -4,10 +4,15 @@ Script de prueba para verificar credenciales de Binance
 """
 import ccxt
 import os
+import sys
+from datetime import datetime
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Plantilla de fila para el listado de activos
+ROW_TMPL = "   • {asset}: {amount}"
+
 print("╔" + "═" * 68 + "╗")
 print("║" + " " * 68 + "║")
 print("║" + "    VERIFICACIÓN DE CREDENCIALES DE BINANCE".center(68) + "║")
@@ -39,14 +44,18 @@ try:
         'secret': api_secret,
         'enableRateLimit': True,
         'options': {
-            'defaultType': 'spot'
+            'defaultType': 'spot',
+            # fetch_balance/fetch_ticker/fetch_ohlcv cargan los mercados de forma
+            # implícita: limitar esa carga a spot (sin futuros USD-M/COIN-M)
+            'fetchMarkets': {'types': ['spot']}
         }
     })
 
-    # Cargar mercados
-    print("ℹ️  Cargando mercados de Binance...")
-    markets = exchange.load_markets()
-    print(f"✅ Conectado exitosamente - {len(markets)} mercados disponibles")
+    # Probar conexión con un único mercado (los mercados spot se cargan
+    # después, en la primera llamada que los necesite)
+    print("ℹ️  Consultando mercado BTC/USDT en Binance...")
+    info = exchange.publicGetExchangeInfo({'symbol': 'BTCUSDT'})
+    print(f"✅ Conectado exitosamente - {len(info['symbols'])} mercado(s) consultado(s)")
     print()
 
     # Verificar permisos obteniendo balance
@@ -65,7 +74,7 @@ try:
         if total_assets:
             print(f"\n📊 Activos en cuenta: {len(total_assets)}")
             for asset, amount in list(total_assets.items())[:5]:
-                print(f"   • {asset}: {amount}")
+                print(ROW_TMPL.format(asset=asset, amount=amount))
         else:
             print("\nℹ️  Balance: $0 (cuenta nueva - normal para paper trading)")
 
@@ -104,10 +113,11 @@ try:
     ohlcv = exchange.fetch_ohlcv('BTC/USDT', '1h', limit=5)
     print(f"✅ Datos históricos obtenidos: {len(ohlcv)} velas")
     print("\n   Últimas velas:")
-    for candle in ohlcv[-3:]:
-        from datetime import datetime
-        timestamp = datetime.fromtimestamp(candle[0] / 1000)
-        print(f"   • {timestamp}: O=${candle[1]:.2f} H=${candle[2]:.2f} L=${candle[3]:.2f} C=${candle[4]:.2f}")
+    rows = [
+        f"   • {datetime.fromtimestamp(c[0] / 1000)}: O=${c[1]:.2f} H=${c[2]:.2f} L=${c[3]:.2f} C=${c[4]:.2f}"
+        for c in ohlcv[-3:]
+    ]
+    sys.stdout.write('\n'.join(rows) + '\n')
 
     print()
     print("=" * 70)
@@ -6,11 +6,21 @@ Ejecutar: python test_telegram.py
 
 import os
 import asyncio
+import functools
+import importlib.util
 from dotenv import load_dotenv
 
 # Cargar variables de entorno
 load_dotenv()
 
+
+@functools.lru_cache(maxsize=4)
+def _get_bot(token: str):
+    """Devuelve un Bot de Telegram cacheado por token."""
+    from telegram import Bot
+    return Bot(token=token)
+
+
 def test_telegram():
     """Prueba el envío de mensaje a Telegram."""
 
@@ -35,17 +45,15 @@ def test_telegram():
     print(f"Chat ID: {chat_id}")
     print("-" * 50)
 
-    try:
-        from telegram import Bot
-        print("python-telegram-bot instalado correctamente")
-    except ImportError:
+    if importlib.util.find_spec('telegram') is None:
         print("ERROR: python-telegram-bot no instalado")
         print("Ejecuta: pip install python-telegram-bot")
         return False
+    print("python-telegram-bot instalado correctamente")
 
     # Enviar mensaje de prueba
     async def send_test():
-        bot = Bot(token=bot_token)
+        bot = _get_bot(bot_token)
 
         message = """
 🧪 <b>TEST DE SATH BOT</b>
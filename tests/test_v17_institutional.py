@@ -12,16 +12,29 @@ Verifica:
 Ejecutar: python -m pytest tests/test_v17_institutional.py -v
 """
 
+import glob
 import sys
 import os
+import logging
 import time
 import unittest
 from unittest.mock import Mock, MagicMock, patch
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+import numpy as np
+
 # Añadir el directorio src al path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+from engines.market_engine import MarketEngine
+from engines.position_engine import PositionEngine
+from modules.institutional_metrics import InstitutionalMetrics, get_institutional_metrics
+from modules.notifications import NotificationManager
+from modules.order_manager import OrderManager, PaperModeSimulator
+from modules.position_store import PositionStore, get_position_store, reset_position_store
+from modules.risk_manager import RiskManager
+
 # =============================================================================
 # TEST 1: TRAILING STOP FIX
 # =============================================================================
@@ -49,20 +62,85 @@ class TestTrailingStopFix(unittest.TestCase):
             }
         }
 
-        # Mocks
-        self.mock_market_engine = Mock()
-        self.mock_order_manager = Mock()
-        self.mock_position_store = Mock()
-        self.mock_notifier = Mock()
-
-    def test_trailing_skip_when_sl_would_trigger_immediately_short(self):
-        """
-        Test crítico: Verifica que el trailing NO mueve el SL
-        si el nuevo valor ya estaría triggered.
-        """
-        from engines.position_engine import PositionEngine
-
-        engine = PositionEngine(
+        # Mocks con spec: solo exponen la API real de cada dependencia
+        self.mock_market_engine = MagicMock(spec=MarketEngine)
+        self.mock_order_manager = MagicMock(spec=OrderManager)
+        self.mock_position_store = MagicMock(spec=PositionStore)
+        self.mock_notifier = MagicMock(spec=NotificationManager)
+
+    # Escenarios de activación del trailing stop (_activate_trailing_stop)
+    TRAILING_SCENARIOS = [
+        # Precio ARRIBA del potencial nuevo SL: el SL estaría triggered
+        # Para short con 1.5% trailing: new_sl = 2860 * 1.015 = 2902.9 >= SL actual
+        dict(
+            id='short_skip',
+            position={
+                'id': 'test123',
+                'symbol': 'ETH/USDT',
+                'side': 'short',
+                'entry_price': 2865.0,
+                'stop_loss': 2889.0,
+                'trailing_stop_active': False
+            },
+            price=2860.0,
+            expect_activate=False
+        ),
+        # Precio bajó significativamente (profit para short)
+        # new_sl = 2750 * 1.015 = 2791.25 (muy por encima de 2750)
+        dict(
+            id='short_activate',
+            position={
+                'id': 'test456',
+                'symbol': 'ETH/USDT',
+                'side': 'short',
+                'entry_price': 2865.0,
+                'quantity': 0.1,
+                'stop_loss': 2920.0,
+                'take_profit': 2700.0,
+                'trailing_stop_active': False
+            },
+            price=2750.0,
+            expect_activate=True
+        ),
+        # Precio justo arriba del entry, nuevo SL estaría cerca
+        # new_sl = 88100 * 0.985 = 86778.5, precio = 88100
+        # Margen = 88100 - 86778.5 = 1321.5 > 0.3% de 88100 = 264.3 ✓
+        dict(
+            id='long_activate',
+            position={
+                'id': 'test789',
+                'symbol': 'BTC/USDT',
+                'side': 'long',
+                'entry_price': 88000.0,
+                'quantity': 0.001,
+                'stop_loss': 86000.0,
+                'take_profit': 92000.0,
+                'trailing_stop_active': False
+            },
+            price=88100.0,
+            expect_activate=True
+        ),
+        # Con 0.2% trailing: new_sl = 2800 * 1.002 = 2805.6
+        # Margen = 2805.6 - 2800 = 5.6 < 0.3% de 2800 = 8.4 → rechazar
+        dict(
+            id='tight_margin',
+            position={
+                'id': 'test_margin',
+                'symbol': 'ETH/USDT',
+                'side': 'short',
+                'entry_price': 2865.0,
+                'stop_loss': 2900.0,
+                'trailing_stop_active': False
+            },
+            price=2800.0,
+            trailing_distance=0.2,
+            expect_activate=False
+        ),
+    ]
+
+    def _make_engine(self):
+        """Crea un PositionEngine con los mocks del test."""
+        return PositionEngine(
             config=self.config,
             market_engine=self.mock_market_engine,
             order_manager=self.mock_order_manager,
@@ -70,112 +148,34 @@ class TestTrailingStopFix(unittest.TestCase):
             notifier=self.mock_notifier
         )
 
-        # Posición SHORT
-        position = {
-            'id': 'test123',
-            'symbol': 'ETH/USDT',
-            'side': 'short',
-            'entry_price': 2865.0,
-            'stop_loss': 2889.0,
-            'trailing_stop_active': False
-        }
-
-        # Precio actual ARRIBA del potencial nuevo SL
-        # Para short con 1.5% trailing: new_sl = 2800 * 1.015 = 2842
-        # Pero si precio es 2860, el SL estaría triggered
-        current_price = 2860.0  # Precio alto
-
-        # El trailing NO debería activarse porque el SL estaría triggered
-        engine._activate_trailing_stop(position, current_price)
-
-        # Verificar que NO se llamó a activate_trailing_stop del store
-        self.mock_position_store.activate_trailing_stop.assert_not_called()
-
-    def test_trailing_activates_when_safe_short(self):
-        """
-        Test: Verifica que el trailing SÍ se activa cuando es seguro.
+    def test_trailing_activation_scenarios(self):
         """
-        from engines.position_engine import PositionEngine
-
-        engine = PositionEngine(
-            config=self.config,
-            market_engine=self.mock_market_engine,
-            order_manager=self.mock_order_manager,
-            position_store=self.mock_position_store,
-            notifier=self.mock_notifier
-        )
-
-        # Posición SHORT con profit
-        position = {
-            'id': 'test456',
-            'symbol': 'ETH/USDT',
-            'side': 'short',
-            'entry_price': 2865.0,
-            'quantity': 0.1,  # Añadido para test
-            'stop_loss': 2920.0,  # SL original lejos
-            'take_profit': 2700.0,
-            'trailing_stop_active': False
-        }
-
-        # Precio bajó significativamente (profit para short)
-        # new_sl = 2750 * 1.015 = 2791.25 (muy por encima de 2750)
-        current_price = 2750.0
+        Test crítico: Verifica que el trailing solo se activa cuando el
+        nuevo SL es seguro (no triggered, margen suficiente).
 
-        engine._activate_trailing_stop(position, current_price)
-
-        # Verificar que SÍ se activó
-        self.mock_position_store.activate_trailing_stop.assert_called_once()
-
-    def test_trailing_skip_when_sl_would_trigger_immediately_long(self):
-        """
-        Test: Verifica skip para posiciones LONG.
+        Un único engine se reutiliza entre escenarios; solo se resetea
+        el mock del store y el trailing distance.
         """
-        from engines.position_engine import PositionEngine
-
-        engine = PositionEngine(
-            config=self.config,
-            market_engine=self.mock_market_engine,
-            order_manager=self.mock_order_manager,
-            position_store=self.mock_position_store,
-            notifier=self.mock_notifier
-        )
+        engine = self._make_engine()
+        default_distance = engine.trailing_distance
 
-        # Posición LONG
-        position = {
-            'id': 'test789',
-            'symbol': 'BTC/USDT',
-            'side': 'long',
-            'entry_price': 88000.0,
-            'quantity': 0.001,  # Añadido para test
-            'stop_loss': 86000.0,
-            'take_profit': 92000.0,
-            'trailing_stop_active': False
-        }
+        for sc in self.TRAILING_SCENARIOS:
+            with self.subTest(scenario=sc['id']):
+                self.mock_position_store.reset_mock()
+                engine.trailing_distance = sc.get('trailing_distance', default_distance)
 
-        # Precio justo arriba del entry, nuevo SL estaría cerca
-        # new_sl = 88100 * 0.985 = 86778.5, precio = 88100
-        # Margen = 88100 - 86778.5 = 1321.5 > 0.3% de 88100 = 264.3 ✓
-        current_price = 88100.0
+                engine._activate_trailing_stop(dict(sc['position']), sc['price'])
 
-        engine._activate_trailing_stop(position, current_price)
-
-        # Debería activarse porque hay margen suficiente
-        # y el nuevo SL (86778) es mejor que el actual (86000)
-        self.mock_position_store.activate_trailing_stop.assert_called_once()
+                if sc['expect_activate']:
+                    self.mock_position_store.activate_trailing_stop.assert_called_once()
+                else:
+                    self.mock_position_store.activate_trailing_stop.assert_not_called()
 
     def test_cooldown_prevents_rapid_updates(self):
         """
         Test: Verifica que el cooldown previene actualizaciones rápidas.
         """
-        from engines.position_engine import PositionEngine
-
-        engine = PositionEngine(
-            config=self.config,
-            market_engine=self.mock_market_engine,
-            order_manager=self.mock_order_manager,
-            position_store=self.mock_position_store,
-            notifier=self.mock_notifier
-        )
+        engine = self._make_engine()
 
         # Posición con trailing activo y última actualización reciente
         position = {
@@ -199,43 +199,6 @@ class TestTrailingStopFix(unittest.TestCase):
         # NO debería actualizarse por cooldown
         engine._update_stop_loss.assert_not_called()
 
-    def test_safety_margin_prevents_tight_sl(self):
-        """
-        Test: Verifica que el margen de seguridad previene SL muy cercanos.
-        """
-        from engines.position_engine import PositionEngine
-
-        engine = PositionEngine(
-            config=self.config,
-            market_engine=self.mock_market_engine,
-            order_manager=self.mock_order_manager,
-            position_store=self.mock_position_store,
-            notifier=self.mock_notifier
-        )
-
-        # Configurar trailing distance muy pequeño para forzar SL cercano
-        engine.trailing_distance = 0.2  # 0.2% - muy pequeño
-
-        position = {
-            'id': 'test_margin',
-            'symbol': 'ETH/USDT',
-            'side': 'short',
-            'entry_price': 2865.0,
-            'stop_loss': 2900.0,
-            'trailing_stop_active': False
-        }
-
-        # Con 0.2% trailing: new_sl = 2800 * 1.002 = 2805.6
-        # Margen = 2805.6 - 2800 = 5.6
-        # 0.3% de 2800 = 8.4
-        # 5.6 < 8.4 → debería rechazar
-        current_price = 2800.0
-
-        engine._activate_trailing_stop(position, current_price)
-
-        # NO debería activarse por margen insuficiente
-        self.mock_position_store.activate_trailing_stop.assert_not_called()
-
 
 # =============================================================================
 # TEST 2: PAPER MODE SIMULATOR
@@ -246,8 +209,6 @@ class TestPaperModeSimulator(unittest.TestCase):
 
     def test_simulator_initialization(self):
         """Test: Verifica inicialización correcta del simulador."""
-        from modules.order_manager import PaperModeSimulator
-
         config = {
             'paper_simulation': {
                 'min_latency_ms': 100,
@@ -267,8 +228,6 @@ class TestPaperModeSimulator(unittest.TestCase):
 
     def test_slippage_always_unfavorable(self):
         """Test: Verifica que el slippage siempre es desfavorable."""
-        from modules.order_manager import PaperModeSimulator
-
         simulator = PaperModeSimulator({
             'paper_simulation': {
                 'min_latency_ms': 0,
@@ -290,15 +249,13 @@ class TestPaperModeSimulator(unittest.TestCase):
 
     def test_process_order_returns_valid_structure(self):
         """Test: Verifica estructura de respuesta de process_order."""
-        from modules.order_manager import PaperModeSimulator
-
         simulator = PaperModeSimulator({
             'paper_simulation': {
                 'min_latency_ms': 1,
                 'max_latency_ms': 2,
                 'failure_rate': 0  # Sin fallos para este test
             }
-        })
+        }, sleep_fn=lambda _: None)
 
         result = simulator.process_order(1000.0, 'buy', 'market')
 
@@ -311,15 +268,14 @@ class TestPaperModeSimulator(unittest.TestCase):
 
     def test_stats_accumulation(self):
         """Test: Verifica acumulación de estadísticas."""
-        from modules.order_manager import PaperModeSimulator
-
+        sleeps = []
         simulator = PaperModeSimulator({
             'paper_simulation': {
                 'min_latency_ms': 10,
                 'max_latency_ms': 10,
                 'failure_rate': 0
             }
-        })
+        }, sleep_fn=sleeps.append)
 
         # Ejecutar varias órdenes
         for _ in range(5):
@@ -329,6 +285,46 @@ class TestPaperModeSimulator(unittest.TestCase):
 
         self.assertEqual(stats['total_orders'], 5)
         self.assertGreater(stats['avg_latency_ms'], 0)
+        # La latencia se simula sin dormir realmente: 5 esperas de 10ms
+        self.assertEqual(sleeps, [0.01] * 5)
+
+    def test_seed_makes_orders_reproducible(self):
+        """Test: Verifica que la misma semilla produce las mismas órdenes."""
+        config = {'paper_simulation': {'seed': 42, 'failure_rate': 0.5}}
+        sim_a = PaperModeSimulator(config, sleep_fn=lambda _: None)
+        sim_b = PaperModeSimulator(config, sleep_fn=lambda _: None)
+
+        results_a = [sim_a.process_order(1000.0, 'buy') for _ in range(10)]
+        results_b = [sim_b.process_order(1000.0, 'buy') for _ in range(10)]
+
+        self.assertEqual(results_a, results_b)
+
+    def test_process_orders_batch(self):
+        """Test: Verifica procesamiento vectorizado de órdenes en lote."""
+        simulator = PaperModeSimulator({
+            'paper_simulation': {
+                'min_latency_ms': 10,
+                'max_latency_ms': 20,
+                'base_slippage_percent': 0.1,
+                'max_slippage_percent': 0.2,
+                'failure_rate': 0
+            }
+        })
+
+        prices = np.full(1000, 1000.0)
+        sides = np.array(['buy', 'sell'] * 500)
+
+        result = simulator.process_orders_batch(prices, sides)
+
+        self.assertTrue(result['success'].all())
+        # Slippage siempre desfavorable
+        self.assertTrue((result['executed_price'][sides == 'buy'] > 1000.0).all())
+        self.assertTrue((result['executed_price'][sides == 'sell'] < 1000.0).all())
+        self.assertTrue(((result['slippage_percent'] >= 0.1) & (result['slippage_percent'] <= 0.2 + 1e-9)).all())
+
+        stats = simulator.get_stats()
+        self.assertEqual(stats['total_orders'], 1000)
+        self.assertGreaterEqual(stats['avg_latency_ms'], 10)
 
 
 # =============================================================================
@@ -359,9 +355,7 @@ class TestKellyCriterionImproved(unittest.TestCase):
 
     def test_conservative_with_few_trades(self):
         """Test: Verifica probabilidad conservadora con pocos trades."""
-        from modules.risk_manager import RiskManager
-
-        rm = RiskManager(self.config)
+        rm = RiskManager(self.config, db_path=':memory:')
 
         # Simular historial con 5 trades (muy pocos)
         rm.trade_history = {'wins': 4, 'losses': 1, 'total_win_amount': 100, 'total_loss_amount': 20}
@@ -374,9 +368,7 @@ class TestKellyCriterionImproved(unittest.TestCase):
 
     def test_moderate_with_medium_trades(self):
         """Test: Verifica blend moderado con historial medio."""
-        from modules.risk_manager import RiskManager
-
-        rm = RiskManager(self.config)
+        rm = RiskManager(self.config, db_path=':memory:')
 
         # Simular 35 trades
         rm.trade_history = {'wins': 25, 'losses': 10, 'total_win_amount': 500, 'total_loss_amount': 200}
@@ -389,9 +381,7 @@ class TestKellyCriterionImproved(unittest.TestCase):
 
     def test_full_confidence_with_many_trades(self):
         """Test: Verifica confianza completa con muchos trades."""
-        from modules.risk_manager import RiskManager
-
-        rm = RiskManager(self.config)
+        rm = RiskManager(self.config, db_path=':memory:')
 
         # Simular 60 trades con buen historial
         rm.trade_history = {'wins': 40, 'losses': 20, 'total_win_amount': 1000, 'total_loss_amount': 400}
@@ -403,9 +393,7 @@ class TestKellyCriterionImproved(unittest.TestCase):
 
     def test_loss_streak_reduces_probability(self):
         """Test: Verifica que racha perdedora reduce probabilidad."""
-        from modules.risk_manager import RiskManager
-
-        rm = RiskManager(self.config)
+        rm = RiskManager(self.config, db_path=':memory:')
 
         # Historial bueno pero racha reciente mala
         rm.trade_history = {'wins': 40, 'losses': 20, 'total_win_amount': 1000, 'total_loss_amount': 400}
@@ -422,9 +410,7 @@ class TestKellyCriterionImproved(unittest.TestCase):
 
     def test_record_trade_result(self):
         """Test: Verifica registro de resultados de trades."""
-        from modules.risk_manager import RiskManager
-
-        rm = RiskManager(self.config)
+        rm = RiskManager(self.config, db_path=':memory:')
 
         rm.record_trade_result(True)  # Win
         rm.record_trade_result(True)  # Win
@@ -441,26 +427,26 @@ class TestKellyCriterionImproved(unittest.TestCase):
 class TestLiquidityValidation(unittest.TestCase):
     """Tests para validación de liquidez."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Crea un único engine sin __init__ compartido por todos los tests."""
+        cls.engine = MarketEngine.__new__(MarketEngine)
+        cls.engine.market_type = 'crypto'
+
     def setUp(self):
         """Configura mocks para tests."""
         self.mock_connection = Mock()
+        self.engine.connection = self.mock_connection
 
     def test_validates_sufficient_liquidity(self):
         """Test: Verifica validación con liquidez suficiente."""
-        from engines.market_engine import MarketEngine
-
         # Mock del order book con buena liquidez
         self.mock_connection.fetch_order_book.return_value = {
             'bids': [[99.9, 100], [99.8, 100], [99.7, 100]],  # $29,970 en bids
             'asks': [[100.1, 100], [100.2, 100], [100.3, 100]]  # $30,060 en asks
         }
 
-        # Crear engine con mock
-        engine = MarketEngine.__new__(MarketEngine)
-        engine.connection = self.mock_connection
-        engine.market_type = 'crypto'
-
-        result = engine.validate_liquidity('TEST/USDT', 500, 'buy')
+        result = self.engine.validate_liquidity('TEST/USDT', 500, 'buy')
 
         self.assertTrue(result['valid'])
         self.assertIn('estimated_slippage', result)
@@ -468,39 +454,27 @@ class TestLiquidityValidation(unittest.TestCase):
 
     def test_rejects_high_spread(self):
         """Test: Verifica rechazo con spread alto."""
-        from engines.market_engine import MarketEngine
-
         # Mock del order book con spread alto (>0.5%)
         self.mock_connection.fetch_order_book.return_value = {
             'bids': [[99.0, 100]],  # Best bid: 99
             'asks': [[100.0, 100]]  # Best ask: 100 → spread = 1%
         }
 
-        engine = MarketEngine.__new__(MarketEngine)
-        engine.connection = self.mock_connection
-        engine.market_type = 'crypto'
-
-        result = engine.validate_liquidity('TEST/USDT', 500, 'buy')
+        result = self.engine.validate_liquidity('TEST/USDT', 500, 'buy')
 
         self.assertFalse(result['valid'])
         self.assertIn('Spread muy alto', result['reason'])
 
     def test_rejects_insufficient_liquidity(self):
         """Test: Verifica rechazo con liquidez insuficiente."""
-        from engines.market_engine import MarketEngine
-
         # Mock con poca liquidez
         self.mock_connection.fetch_order_book.return_value = {
             'bids': [[100.0, 1]],  # Solo $100 en bids
             'asks': [[100.1, 1]]   # Solo $100 en asks
         }
 
-        engine = MarketEngine.__new__(MarketEngine)
-        engine.connection = self.mock_connection
-        engine.market_type = 'crypto'
-
         # Intentar orden de $1000 con solo $100 de liquidez
-        result = engine.validate_liquidity('TEST/USDT', 1000, 'buy')
+        result = self.engine.validate_liquidity('TEST/USDT', 1000, 'buy')
 
         self.assertFalse(result['valid'])
         self.assertIn('Liquidez insuficiente', result['reason'])
@@ -517,18 +491,18 @@ class TestInstitutionalMetrics(unittest.TestCase):
         """Configura métricas para tests."""
         # Usar path temporal para no afectar datos reales
         self.test_path = '/tmp/test_metrics.json'
-        if os.path.exists(self.test_path):
-            os.remove(self.test_path)
+        # JSON de snapshot + log binario de trades y su tabla de cadenas
+        for path in glob.glob(self.test_path.replace('.json', '.*')):
+            os.remove(path)
 
     def tearDown(self):
         """Limpia archivos temporales."""
-        if os.path.exists(self.test_path):
-            os.remove(self.test_path)
+        # JSON de snapshot + log binario de trades y su tabla de cadenas
+        for path in glob.glob(self.test_path.replace('.json', '.*')):
+            os.remove(path)
 
     def test_record_trade(self):
         """Test: Verifica registro de trades."""
-        from modules.institutional_metrics import InstitutionalMetrics
-
         metrics = InstitutionalMetrics(data_path=self.test_path)
 
         metrics.record_trade(
@@ -544,12 +518,58 @@ class TestInstitutionalMetrics(unittest.TestCase):
         )
 
         self.assertEqual(len(metrics.trades), 1)
+        self.assertEqual(metrics.trades[0].symbol, 'BTC/USDT')
         self.assertEqual(metrics.regime_performance['trend']['wins'], 1)
 
+        # Tras recargar desde disco se recupera el mismo trade
+        reloaded = InstitutionalMetrics(data_path=self.test_path)
+        self.assertEqual(reloaded.trades[0].pnl, 50.0)
+        self.assertEqual(reloaded.trades[0].regime, 'trend')
+
+    def test_reload_preserves_text_fields_and_replays_regimes(self):
+        """Test: Texto arbitrario sobrevive al log binario y el régimen se re-aplica."""
+        metrics = InstitutionalMetrics(data_path=self.test_path)
+        metrics.record_trade('BTC/USDT', 'long', 50, 2.5, 40000, 41000, 'trend')
+        metrics._save_data()  # snapshot cubre solo el primer trade
+
+        # Valores fuera de los habituales y texto multibyte largo
+        symbol = 'ÑANDÚ/USDT-PERPETUO-ÉÉÉ'
+        agent_type = 'agente_tendencia_ñ_' + 'é' * 20
+        metrics.record_trade(symbol, 'buy', -20, -1.0, 10, 9.8, 'trending', agent_type)
+        metrics.record_trade('ETH/USDT', 'short', 30, 1.5, 2800, 2758, 'trend')
+
+        reloaded = InstitutionalMetrics(data_path=self.test_path)
+
+        self.assertEqual(
+            [(t.symbol, t.side, t.regime, t.agent_type) for t in reloaded.trades],
+            [(t.symbol, t.side, t.regime, t.agent_type) for t in metrics.trades]
+        )
+        self.assertEqual(reloaded.trades[1].symbol, symbol)
+        self.assertEqual(reloaded.trades[1].side, 'buy')
+        self.assertEqual(reloaded.trades[1].regime, 'trending')
+        # Snapshot (1 win) + re-aplicado del log (1 win), sin contar dos veces
+        self.assertEqual(reloaded.regime_performance, metrics.regime_performance)
+        self.assertEqual(reloaded.regime_performance['trend']['wins'], 2)
+        self.assertEqual(reloaded.regime_performance['trend']['total_pnl'], 80)
+
+    def test_torn_trailing_record_is_dropped(self):
+        """Test: Un registro a medias al final del log no desalinea los siguientes."""
+        metrics = InstitutionalMetrics(data_path=self.test_path)
+        metrics.record_trade('BTC/USDT', 'long', 50, 2.5, 40000, 41000, 'trend')
+        with open(metrics.trades_log_path, 'ab') as f:
+            f.write(b'\x00' * 10)  # corte a mitad de una escritura
+
+        recovered = InstitutionalMetrics(data_path=self.test_path)
+        recovered.record_trade('ETH/USDT', 'short', 30, 1.5, 2800, 2758, 'range')
+
+        reloaded = InstitutionalMetrics(data_path=self.test_path)
+        self.assertEqual(
+            [(t.symbol, t.pnl) for t in reloaded.trades],
+            [('BTC/USDT', 50.0), ('ETH/USDT', 30.0)]
+        )
+
     def test_sharpe_ratio_calculation(self):
         """Test: Verifica cálculo de Sharpe Ratio."""
-        from modules.institutional_metrics import InstitutionalMetrics
-
         metrics = InstitutionalMetrics(data_path=self.test_path)
 
         # Simular retornos diarios
@@ -566,8 +586,6 @@ class TestInstitutionalMetrics(unittest.TestCase):
 
     def test_regime_stats(self):
         """Test: Verifica estadísticas por régimen."""
-        from modules.institutional_metrics import InstitutionalMetrics
-
         metrics = InstitutionalMetrics(data_path=self.test_path)
 
         # Registrar trades en diferentes regímenes
@@ -584,8 +602,6 @@ class TestInstitutionalMetrics(unittest.TestCase):
 
     def test_latency_stats(self):
         """Test: Verifica estadísticas de latencia."""
-        from modules.institutional_metrics import InstitutionalMetrics
-
         metrics = InstitutionalMetrics(data_path=self.test_path)
 
         # Registrar trades con diferentes latencias
@@ -603,8 +619,6 @@ class TestInstitutionalMetrics(unittest.TestCase):
 
     def test_comprehensive_report(self):
         """Test: Verifica reporte completo."""
-        from modules.institutional_metrics import InstitutionalMetrics
-
         metrics = InstitutionalMetrics(data_path=self.test_path)
 
         # Añadir datos
@@ -632,8 +646,6 @@ class TestThreadSafeSingleton(unittest.TestCase):
 
     def test_position_store_singleton(self):
         """Test: Verifica singleton de PositionStore."""
-        from modules.position_store import get_position_store, reset_position_store
-
         # Resetear primero
         reset_position_store()
 
@@ -649,13 +661,18 @@ class TestThreadSafeSingleton(unittest.TestCase):
 
     def test_metrics_singleton(self):
         """Test: Verifica singleton de métricas."""
-        from modules.institutional_metrics import get_institutional_metrics
-
         metrics1 = get_institutional_metrics()
         metrics2 = get_institutional_metrics()
 
         self.assertIs(metrics1, metrics2)
 
+    def test_metrics_singleton_concurrent(self):
+        """Test: Verifica una única instancia con accesos concurrentes."""
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            instances = list(pool.map(lambda _: get_institutional_metrics(), range(32)))
+
+        self.assertTrue(all(m is instances[0] for m in instances))
+
 
 # =============================================================================
 # TEST 7: FILL RATE TRACKING
@@ -667,18 +684,18 @@ class TestFillRateTracking(unittest.TestCase):
     def setUp(self):
         """Configura métricas para tests."""
         self.test_path = '/tmp/test_fillrate_metrics.json'
-        if os.path.exists(self.test_path):
-            os.remove(self.test_path)
+        # JSON de snapshot + log binario de trades y su tabla de cadenas
+        for path in glob.glob(self.test_path.replace('.json', '.*')):
+            os.remove(path)
 
     def tearDown(self):
         """Limpia archivos de test."""
-        if os.path.exists(self.test_path):
-            os.remove(self.test_path)
+        # JSON de snapshot + log binario de trades y su tabla de cadenas
+        for path in glob.glob(self.test_path.replace('.json', '.*')):
+            os.remove(path)
 
     def test_fill_rate_tracking(self):
         """Test: Verifica tracking de fill rate."""
-        from modules.institutional_metrics import InstitutionalMetrics
-
         metrics = InstitutionalMetrics(data_path=self.test_path)
 
         # Simular órdenes
@@ -698,8 +715,6 @@ class TestFillRateTracking(unittest.TestCase):
 
     def test_empty_fill_rate(self):
         """Test: Verifica fill rate cuando no hay órdenes."""
-        from modules.institutional_metrics import InstitutionalMetrics
-
         metrics = InstitutionalMetrics(data_path=self.test_path)
 
         stats = metrics.get_fill_rate_stats()
@@ -718,19 +733,18 @@ class TestSlippageAlerts(unittest.TestCase):
     def setUp(self):
         """Configura métricas para tests."""
         self.test_path = '/tmp/test_slippage_metrics.json'
-        if os.path.exists(self.test_path):
-            os.remove(self.test_path)
+        # JSON de snapshot + log binario de trades y su tabla de cadenas
+        for path in glob.glob(self.test_path.replace('.json', '.*')):
+            os.remove(path)
 
     def tearDown(self):
         """Limpia archivos de test."""
-        if os.path.exists(self.test_path):
-            os.remove(self.test_path)
+        # JSON de snapshot + log binario de trades y su tabla de cadenas
+        for path in glob.glob(self.test_path.replace('.json', '.*')):
+            os.remove(path)
 
     def test_slippage_alert_threshold(self):
         """Test: Verifica que se generen alertas con slippage alto."""
-        from modules.institutional_metrics import InstitutionalMetrics
-        import logging
-
         metrics = InstitutionalMetrics(
             config={'slippage_alert_threshold': 0.3},
             data_path=self.test_path
@@ -755,8 +769,6 @@ class TestSlippageAlerts(unittest.TestCase):
 
     def test_periodic_report_includes_fill_rate(self):
         """Test: Verifica que el reporte periódico incluya fill rate."""
-        from modules.institutional_metrics import InstitutionalMetrics
-
         metrics = InstitutionalMetrics(data_path=self.test_path)
 
         # Añadir algunos datos
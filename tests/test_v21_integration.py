@@ -13,9 +13,16 @@ Verifica todas las correcciones implementadas en v2.1:
 Ejecutar: python -m pytest tests/test_v21_integration.py -v
 """
 
-import sys
+import datetime as dt
+from unittest.mock import patch
+
 import pytest
-sys.path.insert(0, 'src')
+
+import numpy as np
+
+from engines.ai_engine import AIEngine, RANGE_ZONES, validate_entries
+from engines.market_engine import MarketEngine
+from modules.risk_manager import RiskManager, hours_to_mask
 
 
 class TestADXThreshold:
@@ -23,8 +30,6 @@ class TestADXThreshold:
 
     def test_adx_below_25_returns_low_volatility_or_ranging(self):
         """ADX < 25 debe retornar low_volatility o ranging."""
-        from engines.ai_engine import AIEngine
-
         class MockAIEngine(AIEngine):
             def __init__(self):
                 self.config = {'ai_agents': {'min_adx_trend': 25}}
@@ -48,8 +53,6 @@ class TestADXThreshold:
 
     def test_adx_above_25_with_aligned_emas_returns_trending(self):
         """ADX >= 25 con EMAs alineados debe retornar trending."""
-        from engines.ai_engine import AIEngine
-
         class MockAIEngine(AIEngine):
             def __init__(self):
                 self.config = {'ai_agents': {'min_adx_trend': 25}}
@@ -184,26 +187,109 @@ class TestVolumeThreshold:
         assert accepted == should_accept, f"Volumen {volume}x: esperado {should_accept}, got {accepted}"
 
 
+class TestValidateEntries:
+    """Tests para la validación vectorizada multi-símbolo."""
+
+    def test_matches_scalar_rules(self):
+        """El resultado vectorizado coincide con las reglas escalares."""
+        rsi = np.array([25, 35, 50, 65, 75, 50])
+        vol = np.array([1.3, 0.8, 1.0, 2.0, 1.3, 1.0])
+        price = np.array([96000, 100000, 104000, 100000, 96000, 100000])
+        bb_lo = np.full(6, 95000.0)
+        bb_hi = np.array([105000, 105000, 105000, 105000, 105000, 95000.0])
+
+        ok, zone = validate_entries(rsi, vol, price, bb_lo, bb_hi)
+
+        assert ok.tolist() == [False, False, True, True, False, True]
+        assert [RANGE_ZONES[z] for z in zone] == [
+            "soporte", "medio", "resistencia", "medio", "soporte", "medio"
+        ]
+
+    def test_missing_bands_zone_unknown(self):
+        """Sin Bandas de Bollinger la zona es desconocida, como en el agente de rango."""
+        ok, zone = validate_entries(
+            np.array([50, 50]), np.array([1.0, 1.0]), np.array([100000, 100000]),
+            np.array([0.0, 95000.0]), np.array([105000.0, 0.0])
+        )
+
+        assert ok.tolist() == [True, True]
+        assert [RANGE_ZONES[z] for z in zone] == ["desconocida", "desconocida"]
+
+
 class TestSessionFilter:
     """Tests para session filter."""
 
     def test_avoid_hours(self):
         """Horas 00:00-06:00 UTC deben evitarse."""
-        avoid_hours = [(0, 6)]
+        avoid_mask = hours_to_mask([(0, 6)])
 
         for hour in range(0, 6):
-            is_avoid = any(start <= hour < end for start, end in avoid_hours)
+            is_avoid = (avoid_mask >> hour) & 1
             assert is_avoid, f"Hora {hour}:00 UTC debería evitarse"
 
+        for hour in range(6, 24):
+            assert not (avoid_mask >> hour) & 1, f"Hora {hour}:00 UTC no debería evitarse"
+
     def test_optimal_hours(self):
         """Horas óptimas deben aceptarse."""
         optimal_hours = [(7, 16), (13, 22)]
+        optimal_mask = hours_to_mask(optimal_hours)
 
         # 14:00 UTC está en ambos rangos óptimos
         hour = 14
-        is_optimal = any(start <= hour < end for start, end in optimal_hours)
+        is_optimal = (optimal_mask >> hour) & 1
         assert is_optimal, f"Hora {hour}:00 UTC debería ser óptima"
 
+        # La máscara equivale a recorrer los rangos hora a hora
+        for hour in range(24):
+            expected = any(start <= hour < end for start, end in optimal_hours)
+            assert bool((optimal_mask >> hour) & 1) == expected
+
+    @staticmethod
+    def _session_at(rm, hour):
+        """is_optimal_session() con el reloj fijado un miércoles a hour:30 UTC."""
+        fixed = dt.datetime(2026, 10, 14, hour, 30, tzinfo=dt.timezone.utc)
+
+        class FixedDatetime(dt.datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return fixed.astimezone(tz) if tz else fixed
+
+        with patch('datetime.datetime', FixedDatetime):
+            return rm.is_optimal_session()
+
+    def test_is_optimal_session_fractional_range(self):
+        """Un rango [7.5, 16] no incluye las 07:xx y no debe fallar."""
+        config = {'risk_management': {'session_filter': {
+            'enabled': True, 'optimal_hours_utc': [[7.5, 16]]}}}
+        rm = RiskManager(config, db_path=':memory:')
+
+        assert hours_to_mask([(7.5, 16)]) == hours_to_mask([(8, 16)])
+        assert self._session_at(rm, 7)['optimal'] is False
+        result = self._session_at(rm, 8)
+        assert result['optimal'] is True
+        assert '7.5' in result['reason']
+
+    def test_is_optimal_session_after_reassigning_hours(self):
+        """Reasignar optimal_hours_utc recompila la tabla de horas."""
+        config = {'risk_management': {'session_filter': {
+            'enabled': True, 'optimal_hours_utc': [[7, 16]]}}}
+        rm = RiskManager(config, db_path=':memory:')
+        assert self._session_at(rm, 20)['optimal'] is False
+
+        rm.optimal_hours_utc = [[18, 22]]
+        assert self._session_at(rm, 20)['optimal'] is True
+        assert self._session_at(rm, 8)['optimal'] is False
+
+
+class TestConfigDict:
+    """v2.2: Los engines aceptan la config ya cargada en vez de una ruta."""
+
+    @pytest.mark.parametrize("engine_cls", [AIEngine, MarketEngine])
+    def test_load_config_accepts_dict(self, engine_cls, paper_config):
+        engine = engine_cls.__new__(engine_cls)
+        assert engine._load_config(paper_config) is paper_config
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -6,55 +6,97 @@ Tests para las mejoras de SATH v2.2.2
 - Filtros actualizados en config
 """
 
-import sys
-import os
 import tempfile
 from datetime import datetime, timedelta
-from unittest.mock import MagicMock, patch
-
-# Agregar src al path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from unittest.mock import Mock, patch
 
 import pytest
-import yaml
 
+# Import único de los engines (arrastran ccxt/pandas); sin dependencias se omite el modulo
+try:
+    from engines.market_engine import MarketEngine
+    from engines.position_engine import PositionEngine
+    from modules.order_manager import OrderManager
+except ImportError as e:
+    pytest.skip(f"Dependencias de engines no disponibles: {e}", allow_module_level=True)
 
-class TestSymbolCooldown:
-    """Tests para el cooldown post-cierre de posicion."""
+class _StubStore:
+    """PositionStore minimo: sin posiciones abiertas."""
 
-    def test_cooldown_blocks_immediate_reentry(self):
-        """Verifica que el cooldown bloquea re-entrada inmediata."""
-        from engines.position_engine import PositionEngine
-
-        # Mock de dependencias
-        config = {
-            'position_management': {
-                'enabled': True,
-                'protection_mode': 'oco',
-                'symbol_cooldown_minutes': 15,
-                'trailing_stop': {'enabled': False},
-                'portfolio': {'max_concurrent_positions': 3},
-                'local_monitoring': {'check_interval_ms': 500}
-            }
-        }
+    def get_open_positions(self):
+        return []
+
+
+class _StubNotifier:
+    """NotificationManager minimo: descarta las notificaciones que envia PositionEngine."""
+
+    def notify_sl_hit(self, *args, **kwargs):
+        pass
+
+    def notify_tp_hit(self, *args, **kwargs):
+        pass
+
+    def notify_trade_closed(self, *args, **kwargs):
+        pass
+
+
+# Reloj congelado para los tests de cooldown
+FROZEN_NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def frozen_now():
+    """Congela datetime.now() dentro de position_engine en FROZEN_NOW."""
+    with patch('engines.position_engine.datetime', wraps=datetime) as mock_datetime:
+        mock_datetime.now.return_value = FROZEN_NOW
+        yield FROZEN_NOW
+
+
+# Config base de position_management (construida una vez)
+BASE_PM = {
+    'enabled': True,
+    'protection_mode': 'oco',
+    'symbol_cooldown_minutes': 15,
+    'trailing_stop': {'enabled': False},
+    'portfolio': {'max_concurrent_positions': 3},
+    'local_monitoring': {'check_interval_ms': 500}
+}
+
+
+def make_config(**overrides):
+    """Config con BASE_PM + overrides (copia superficial); valor None elimina la clave."""
+    pm = {**BASE_PM, **overrides}
+    return {'position_management': {k: v for k, v in pm.items() if v is not None}}
 
-        # Crear mocks
-        market_engine = MagicMock()
-        order_manager = MagicMock()
-        position_store = MagicMock()
-        position_store.get_open_positions.return_value = []
-        notifier = MagicMock()
 
-        engine = PositionEngine(
+@pytest.fixture
+def engine_factory():
+    """Construye un PositionEngine con dependencias mock y cooldown configurable."""
+    def _build(symbol_cooldown_minutes=15):
+        # None = config sin cooldown especificado
+        config = make_config(symbol_cooldown_minutes=symbol_cooldown_minutes)
+
+        # Stubs ligeros para store/notifier; mocks con spec para el resto
+        return PositionEngine(
             config=config,
-            market_engine=market_engine,
-            order_manager=order_manager,
-            position_store=position_store,
-            notifier=notifier
+            market_engine=Mock(spec=MarketEngine),
+            order_manager=Mock(spec=OrderManager),
+            position_store=_StubStore(),
+            notifier=_StubNotifier()
         )
 
+    return _build
+
+
+class TestSymbolCooldown:
+    """Tests para el cooldown post-cierre de posicion."""
+
+    def test_cooldown_blocks_immediate_reentry(self, engine_factory, frozen_now):
+        """Verifica que el cooldown bloquea re-entrada inmediata."""
+        engine = engine_factory()
+
         # Simular cierre de posicion
-        engine.symbol_last_close['ETH/USDT'] = datetime.now()
+        engine.symbol_last_close['ETH/USDT'] = frozen_now
 
         # Intentar abrir nueva posicion inmediatamente
         can_open = engine.can_open_position('ETH/USDT')
@@ -62,37 +104,12 @@ class TestSymbolCooldown:
         # Debe bloquear
         assert can_open is False
 
-    def test_cooldown_allows_after_expiry(self):
+    def test_cooldown_allows_after_expiry(self, engine_factory, frozen_now):
         """Verifica que permite re-entrada despues del cooldown."""
-        from engines.position_engine import PositionEngine
-
-        config = {
-            'position_management': {
-                'enabled': True,
-                'protection_mode': 'oco',
-                'symbol_cooldown_minutes': 15,
-                'trailing_stop': {'enabled': False},
-                'portfolio': {'max_concurrent_positions': 3},
-                'local_monitoring': {'check_interval_ms': 500}
-            }
-        }
-
-        market_engine = MagicMock()
-        order_manager = MagicMock()
-        position_store = MagicMock()
-        position_store.get_open_positions.return_value = []
-        notifier = MagicMock()
-
-        engine = PositionEngine(
-            config=config,
-            market_engine=market_engine,
-            order_manager=order_manager,
-            position_store=position_store,
-            notifier=notifier
-        )
+        engine = engine_factory()
 
         # Simular cierre hace 20 minutos (cooldown expirado)
-        engine.symbol_last_close['ETH/USDT'] = datetime.now() - timedelta(minutes=20)
+        engine.symbol_last_close['ETH/USDT'] = frozen_now - timedelta(minutes=20)
 
         # Intentar abrir nueva posicion
         can_open = engine.can_open_position('ETH/USDT')
@@ -102,37 +119,12 @@ class TestSymbolCooldown:
         # Debe limpiar el registro
         assert 'ETH/USDT' not in engine.symbol_last_close
 
-    def test_cooldown_different_symbols(self):
+    def test_cooldown_different_symbols(self, engine_factory, frozen_now):
         """Verifica que cooldown es por simbolo, no global."""
-        from engines.position_engine import PositionEngine
-
-        config = {
-            'position_management': {
-                'enabled': True,
-                'protection_mode': 'oco',
-                'symbol_cooldown_minutes': 15,
-                'trailing_stop': {'enabled': False},
-                'portfolio': {'max_concurrent_positions': 3},
-                'local_monitoring': {'check_interval_ms': 500}
-            }
-        }
-
-        market_engine = MagicMock()
-        order_manager = MagicMock()
-        position_store = MagicMock()
-        position_store.get_open_positions.return_value = []
-        notifier = MagicMock()
-
-        engine = PositionEngine(
-            config=config,
-            market_engine=market_engine,
-            order_manager=order_manager,
-            position_store=position_store,
-            notifier=notifier
-        )
+        engine = engine_factory()
 
         # Simular cierre de ETH (en cooldown)
-        engine.symbol_last_close['ETH/USDT'] = datetime.now()
+        engine.symbol_last_close['ETH/USDT'] = frozen_now
 
         # ETH bloqueado
         assert engine.can_open_position('ETH/USDT') is False
@@ -140,33 +132,22 @@ class TestSymbolCooldown:
         # BTC debe estar permitido
         assert engine.can_open_position('BTC/USDT') is True
 
-    def test_cooldown_default_value(self):
-        """Verifica el valor por defecto del cooldown."""
-        from engines.position_engine import PositionEngine
+    def test_cooldown_expires_exactly_at_limit(self, engine_factory, frozen_now):
+        """Verifica el limite exacto del cooldown con el reloj congelado."""
+        engine = engine_factory()
 
-        # Config sin cooldown especificado
-        config = {
-            'position_management': {
-                'enabled': True,
-                'protection_mode': 'oco',
-                'trailing_stop': {'enabled': False},
-                'portfolio': {'max_concurrent_positions': 3},
-                'local_monitoring': {'check_interval_ms': 500}
-            }
-        }
+        # 1 segundo antes de cumplir 15 minutos: sigue bloqueado
+        engine.symbol_last_close['ETH/USDT'] = frozen_now - timedelta(minutes=15) + timedelta(seconds=1)
+        assert engine.can_open_position('ETH/USDT') is False
 
-        market_engine = MagicMock()
-        order_manager = MagicMock()
-        position_store = MagicMock()
-        notifier = MagicMock()
+        # Justo 15 minutos: permitido
+        engine.symbol_last_close['ETH/USDT'] = frozen_now - timedelta(minutes=15)
+        assert engine.can_open_position('ETH/USDT') is True
 
-        engine = PositionEngine(
-            config=config,
-            market_engine=market_engine,
-            order_manager=order_manager,
-            position_store=position_store,
-            notifier=notifier
-        )
+    def test_cooldown_default_value(self, engine_factory):
+        """Verifica el valor por defecto del cooldown."""
+        # Config sin cooldown especificado
+        engine = engine_factory(symbol_cooldown_minutes=None)
 
         # Debe usar 15 minutos por defecto
         assert engine.symbol_cooldown_minutes == 15
@@ -175,107 +156,26 @@ class TestSymbolCooldown:
 class TestConfigV222:
     """Tests para la configuracion actualizada v2.2.2."""
 
-    def test_config_paper_loads(self):
+    def test_config_paper_loads(self, paper_config):
         """Verifica que config_paper.yaml carga correctamente."""
-        config_path = os.path.join(
-            os.path.dirname(__file__),
-            '..',
-            'config',
-            'config_paper.yaml'
-        )
-
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+        config = paper_config
 
         assert config is not None
         assert 'ai_agents' in config
         assert 'position_management' in config
 
-    def test_cooldown_in_config(self):
-        """Verifica que symbol_cooldown_minutes esta en config."""
-        config_path = os.path.join(
-            os.path.dirname(__file__),
-            '..',
-            'config',
-            'config_paper.yaml'
-        )
-
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
-
-        pm = config.get('position_management', {})
-        cooldown = pm.get('symbol_cooldown_minutes')
-
-        assert cooldown is not None
-        assert cooldown == 15
-
-    def test_volatility_threshold_updated(self):
-        """Verifica min_volatility_percent actualizado a 0.5."""
-        config_path = os.path.join(
-            os.path.dirname(__file__),
-            '..',
-            'config',
-            'config_paper.yaml'
-        )
-
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
-
-        agents = config.get('ai_agents', {})
-        vol = agents.get('min_volatility_percent')
-
-        assert vol == 0.5
-
-    def test_adx_threshold_updated(self):
-        """Verifica min_adx_trend actualizado a 22."""
-        config_path = os.path.join(
-            os.path.dirname(__file__),
-            '..',
-            'config',
-            'config_paper.yaml'
-        )
-
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
-
-        agents = config.get('ai_agents', {})
-        adx = agents.get('min_adx_trend')
-
-        assert adx == 22
-
-    def test_mtf_alignment_updated(self):
-        """Verifica MTF min_alignment_score actualizado a 0.60."""
-        config_path = os.path.join(
-            os.path.dirname(__file__),
-            '..',
-            'config',
-            'config_paper.yaml'
-        )
-
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
-
-        mtf = config.get('multi_timeframe', {})
-        alignment = mtf.get('min_alignment_score')
-
-        assert alignment == 0.60
-
-    def test_confidence_threshold_updated(self):
-        """Verifica default_min_confidence actualizado a 0.60."""
-        config_path = os.path.join(
-            os.path.dirname(__file__),
-            '..',
-            'config',
-            'config_paper.yaml'
-        )
-
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
-
-        adaptive = config.get('adaptive_parameters', {})
-        confidence = adaptive.get('default_min_confidence')
-
-        assert confidence == 0.60
+    @pytest.mark.parametrize("section,key,expected", [
+        ("position_management", "symbol_cooldown_minutes", 15),
+        ("ai_agents", "min_volatility_percent", 0.5),
+        ("ai_agents", "min_adx_trend", 22),
+        ("multi_timeframe", "min_alignment_score", 0.60),
+        ("adaptive_parameters", "default_min_confidence", 0.60),
+    ])
+    def test_config_value(self, paper_config, section, key, expected):
+        """Verifica cooldown, volatilidad, ADX, alineacion MTF y confianza en config."""
+        value = paper_config.get(section, {}).get(key)
+
+        assert value == expected, f"{section}.{key}: esperado {expected}, got {value}"
 
 
 class TestRiskManagerIntegration:
@@ -7,17 +7,18 @@ Tests para las mejoras de SATH v2.2
 - Configuracion paper optimizada
 """
 
-import sys
-import os
-import tempfile
 import sqlite3
-import json
-
-# Agregar src al path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 import pytest
 
+from engines.ai_engine import AIEngine, DECISION_MAP
+
+
+@pytest.fixture(scope="class")
+def risk_env(tmp_path_factory):
+    """Ruta de DB en un directorio temporal compartido por la clase (sin os.chdir)."""
+    return str(tmp_path_factory.mktemp("risk") / 'risk_manager.db')
+
 
 class TestRiskManagerSQLite:
     """Tests para la nueva persistencia SQLite del Risk Manager."""
@@ -38,35 +39,15 @@ class TestRiskManagerSQLite:
             }
         }
 
-        # Usar directorio temporal
-        with tempfile.TemporaryDirectory() as tmpdir:
-            # Cambiar al directorio temporal para crear la DB ahi
-            original_cwd = os.getcwd()
-            os.chdir(tmpdir)
-            os.makedirs('data', exist_ok=True)
-
-            try:
-                rm = RiskManager(config)
-
-                # Verificar que la DB existe
-                assert os.path.exists('data/risk_manager.db')
-
-                # Verificar tablas
-                conn = sqlite3.connect('data/risk_manager.db')
-                cursor = conn.cursor()
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-                tables = [row[0] for row in cursor.fetchall()]
-                conn.close()
+        # Solo se verifica el esquema: DB en memoria, sin IO de disco
+        rm = RiskManager(config, db_path=':memory:')
 
-                assert 'risk_state' in tables
-                assert 'trade_history_kelly' in tables
-                assert 'recent_results' in tables
-                assert 'open_trades' in tables
+        # Verificar tablas (sobre la propia conexion del Risk Manager)
+        tables = set(rm.list_tables())
+        assert tables >= set(RiskManager.SCHEMA_TABLES)
+        assert {'risk_state', 'trade_history_kelly', 'recent_results', 'open_trades'} <= tables
 
-            finally:
-                os.chdir(original_cwd)
-
-    def test_save_and_load_state(self):
+    def test_save_and_load_state(self, risk_env):
         """Verifica que el estado se guarda y carga correctamente."""
         from modules.risk_manager import RiskManager
 
@@ -78,34 +59,27 @@ class TestRiskManagerSQLite:
                 'min_risk_reward_ratio': 2.0,
                 'kelly_criterion': {'enabled': True, 'fraction': 0.25},
                 'atr_stops': {'enabled': False},
+                # Tests: journal en memoria y sin fsync
+                'sqlite_pragmas': {'journal_mode': 'MEMORY', 'synchronous': 'OFF'},
             }
         }
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            original_cwd = os.getcwd()
-            os.chdir(tmpdir)
-            os.makedirs('data', exist_ok=True)
-
-            try:
-                # Crear Risk Manager y modificar estado
-                rm = RiskManager(config)
-                rm.current_capital = 1050
-                rm.daily_pnl = 50
-                rm.trade_history['wins'] = 5
-                rm.trade_history['losses'] = 3
-                rm._save_state()
+        # Crear Risk Manager y modificar estado
+        rm = RiskManager(config, db_path=risk_env)
+        rm.current_capital = 1050
+        rm.daily_pnl = 50
+        rm.trade_history['wins'] = 5
+        rm.trade_history['losses'] = 3
+        rm._save_state()
 
-                # Crear nuevo Risk Manager (debe cargar estado)
-                rm2 = RiskManager(config)
+        # Crear nuevo Risk Manager (debe cargar estado)
+        rm2 = RiskManager(config, db_path=risk_env)
 
-                assert rm2.current_capital == 1050
-                assert rm2.trade_history['wins'] == 5
-                assert rm2.trade_history['losses'] == 3
+        assert rm2.current_capital == 1050
+        assert rm2.trade_history['wins'] == 5
+        assert rm2.trade_history['losses'] == 3
 
-            finally:
-                os.chdir(original_cwd)
-
-    def test_record_trade_result_persists(self):
+    def test_record_trade_result_persists(self, risk_env):
         """Verifica que los resultados de trades se persisten."""
         from modules.risk_manager import RiskManager
 
@@ -117,148 +91,88 @@ class TestRiskManagerSQLite:
                 'min_risk_reward_ratio': 2.0,
                 'kelly_criterion': {'enabled': True, 'fraction': 0.25},
                 'atr_stops': {'enabled': False},
+                # Tests: journal en memoria y sin fsync
+                'sqlite_pragmas': {'journal_mode': 'MEMORY', 'synchronous': 'OFF'},
             }
         }
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            original_cwd = os.getcwd()
-            os.chdir(tmpdir)
-            os.makedirs('data', exist_ok=True)
+        rm = RiskManager(config, db_path=risk_env)
+
+        # Registrar resultados
+        rm.record_trade_result(True, 25.0)  # Win
+        rm.record_trade_result(False, -10.0)  # Loss
+        rm.record_trade_result(True, 30.0)  # Win
+
+        # Verificar en DB
+        conn = sqlite3.connect(risk_env)
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM recent_results")
+        count = cursor.fetchone()[0]
+        conn.close()
+
+        assert count >= 3
+
+    def test_sqlite_pragmas_from_config(self, risk_env):
+        """Verifica que los PRAGMAs de SQLite se aplican desde la config."""
+        from modules.risk_manager import RiskManager
 
-            try:
-                rm = RiskManager(config)
+        config = {
+            'risk_management': {
+                'initial_capital': 1000,
+                'sqlite_pragmas': {'journal_mode': 'MEMORY', 'synchronous': 'OFF'},
+            }
+        }
 
-                # Registrar resultados
-                rm.record_trade_result(True, 25.0)  # Win
-                rm.record_trade_result(False, -10.0)  # Loss
-                rm.record_trade_result(True, 30.0)  # Win
+        rm = RiskManager(config, db_path=risk_env)
 
-                # Verificar en DB
-                conn = sqlite3.connect('data/risk_manager.db')
-                cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) FROM recent_results")
-                count = cursor.fetchone()[0]
-                conn.close()
+        with rm._get_connection() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'memory'
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 0
 
-                assert count >= 3
 
-            finally:
-                os.chdir(original_cwd)
+@pytest.fixture(scope="module")
+def engine():
+    """AIEngine sin inicializar: el fallback parser no usa config ni clientes."""
+    return AIEngine.__new__(AIEngine)
 
 
 class TestAIEngineFallbackParser:
     """Tests para el fallback parser de AI Engine."""
 
-    def test_fallback_detects_buy_signal(self):
-        """Verifica que el fallback detecta senales de compra."""
-        # Simular el metodo de fallback
-        def fallback_text_parser(text):
-            text_lower = text.lower()
-            buy_keywords = ['compra', 'buy', 'long', 'bullish', 'alcista']
-            sell_keywords = ['venta', 'sell', 'short', 'bearish', 'bajista']
-            wait_keywords = ['espera', 'wait', 'hold', 'neutral']
-
-            buy_score = sum(1 for kw in buy_keywords if kw in text_lower)
-            sell_score = sum(1 for kw in sell_keywords if kw in text_lower)
-            wait_score = sum(1 for kw in wait_keywords if kw in text_lower)
-
-            if buy_score > sell_score and buy_score > wait_score:
-                return 'COMPRA'
-            elif sell_score > buy_score and sell_score > wait_score:
-                return 'VENTA'
-            return 'ESPERA'
-
-        # Test buy signal
-        text = "El mercado muestra senales bullish, recomiendo compra long position"
-        assert fallback_text_parser(text) == 'COMPRA'
-
-    def test_fallback_detects_sell_signal(self):
-        """Verifica que el fallback detecta senales de venta."""
-        def fallback_text_parser(text):
-            text_lower = text.lower()
-            buy_keywords = ['compra', 'buy', 'long', 'bullish', 'alcista']
-            sell_keywords = ['venta', 'sell', 'short', 'bearish', 'bajista']
-            wait_keywords = ['espera', 'wait', 'hold', 'neutral']
-
-            buy_score = sum(1 for kw in buy_keywords if kw in text_lower)
-            sell_score = sum(1 for kw in sell_keywords if kw in text_lower)
-            wait_score = sum(1 for kw in wait_keywords if kw in text_lower)
-
-            if buy_score > sell_score and buy_score > wait_score:
-                return 'COMPRA'
-            elif sell_score > buy_score and sell_score > wait_score:
-                return 'VENTA'
-            return 'ESPERA'
-
-        # Test sell signal
-        text = "Tendencia bearish, sell short venta recomendada"
-        assert fallback_text_parser(text) == 'VENTA'
-
-    def test_fallback_detects_wait_signal(self):
-        """Verifica que el fallback detecta senales de espera."""
-        def fallback_text_parser(text):
-            text_lower = text.lower()
-            buy_keywords = ['compra', 'buy', 'long', 'bullish', 'alcista']
-            sell_keywords = ['venta', 'sell', 'short', 'bearish', 'bajista']
-            wait_keywords = ['espera', 'wait', 'hold', 'neutral']
-
-            buy_score = sum(1 for kw in buy_keywords if kw in text_lower)
-            sell_score = sum(1 for kw in sell_keywords if kw in text_lower)
-            wait_score = sum(1 for kw in wait_keywords if kw in text_lower)
-
-            if buy_score > sell_score and buy_score > wait_score:
-                return 'COMPRA'
-            elif sell_score > buy_score and sell_score > wait_score:
-                return 'VENTA'
-            return 'ESPERA'
-
-        # Test wait signal
-        text = "Mercado neutral, mantener hold position, espera mejor entrada"
-        assert fallback_text_parser(text) == 'ESPERA'
+    @pytest.mark.parametrize("text,expected", [
+        ("El mercado muestra senales bullish, recomiendo compra long position", "COMPRA"),
+        ("Tendencia bearish, sell short venta recomendada", "VENTA"),
+        ("Mercado neutral, mantener hold position, espera mejor entrada", "ESPERA"),
+    ])
+    def test_fallback_detects_signal(self, engine, text, expected):
+        """Verifica que el fallback detecta senales de compra, venta y espera."""
+        result = engine._fallback_text_parser(text)
+        assert result['decision'] == expected
+        assert result['analysis_type'] == 'fallback_parser'
 
     def test_decision_mapping(self):
         """Verifica el mapeo de sinonimos de decisiones."""
-        decision_map = {
-            'COMPRA': 'COMPRA', 'BUY': 'COMPRA', 'LONG': 'COMPRA',
-            'VENTA': 'VENTA', 'SELL': 'VENTA', 'SHORT': 'VENTA',
-            'ESPERA': 'ESPERA', 'HOLD': 'ESPERA', 'WAIT': 'ESPERA', 'NEUTRAL': 'ESPERA'
-        }
-
-        assert decision_map.get('BUY') == 'COMPRA'
-        assert decision_map.get('SELL') == 'VENTA'
-        assert decision_map.get('HOLD') == 'ESPERA'
-        assert decision_map.get('LONG') == 'COMPRA'
-        assert decision_map.get('SHORT') == 'VENTA'
+        assert DECISION_MAP.get('BUY') == 'COMPRA'
+        assert DECISION_MAP.get('SELL') == 'VENTA'
+        assert DECISION_MAP.get('HOLD') == 'ESPERA'
+        assert DECISION_MAP.get('LONG') == 'COMPRA'
+        assert DECISION_MAP.get('SHORT') == 'VENTA'
 
 
 class TestConfigPaperOptimization:
     """Tests para verificar la configuracion paper optimizada."""
 
-    def test_config_loads_correctly(self):
+    def test_config_loads_correctly(self, paper_config):
         """Verifica que la configuracion paper carga correctamente."""
-        import yaml
-
-        config_path = os.path.join(
-            os.path.dirname(__file__), '..', 'config', 'config_paper.yaml'
-        )
-
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+        config = paper_config
 
         assert config is not None
         assert 'trading' in config
         assert 'risk_management' in config
 
-    def test_optimized_thresholds(self):
+    def test_optimized_thresholds(self, paper_config):
         """Verifica que los thresholds optimizados estan correctos."""
-        import yaml
-
-        config_path = os.path.join(
-            os.path.dirname(__file__), '..', 'config', 'config_paper.yaml'
-        )
-
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+        config = paper_config
 
         # Verificar thresholds optimizados (v2.2.2: mas estrictos para calidad)
         ai_agents = config.get('ai_agents', {})
@@ -270,16 +184,9 @@ class TestConfigPaperOptimization:
         kelly = risk.get('kelly_criterion', {})
         assert kelly.get('min_confidence', 0.70) <= 0.60  # Mas trades
 
-    def test_capital_configuration(self):
+    def test_capital_configuration(self, paper_config):
         """Verifica la configuracion de capital."""
-        import yaml
-
-        config_path = os.path.join(
-            os.path.dirname(__file__), '..', 'config', 'config_paper.yaml'
-        )
-
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+        config = paper_config
 
         risk = config.get('risk_management', {})
         assert risk.get('initial_capital') == 1000
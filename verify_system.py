@@ -5,48 +5,228 @@ SATH v2.2 - Script de Verificacion del Sistema
 Verifica que todo el sistema este listo para operar.
 
 Uso:
-    python verify_system.py [config_file]
+    python verify_system.py [config_file] [--no-cache] [--deep] [-v]
 
 Ejemplo:
     python verify_system.py config/config_paper.yaml
+    python verify_system.py config/config_paper.yaml --no-cache
+    python verify_system.py config/config_paper.yaml --deep
 """
 
+import argparse
+import functools
+import hashlib
+import importlib.metadata
+import importlib.util
+import io
+import json
+import sqlite3
 import sys
 import os
 import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
+
+# v2.2: libyaml (C) si esta disponible; check_dependencies reporta si falta pyyaml
+try:
+    import yaml
+    _YLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    _YDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+except ImportError:
+    yaml = None
+    _YLoader = _YDumper = None
 
 # Agregar src al path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
+# v2.2: Imports pesados una sola vez al cargar el script, no dentro de cada
+# check (evita re-entrar al sistema de imports desde los checks en paralelo).
+# Si falta alguno, el check correspondiente lo reporta como FAIL.
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    load_dotenv = None
+
+try:
+    from openai import OpenAI
+except ImportError:
+    OpenAI = None
+
+try:
+    import httpx  # dependencia de openai
+except ImportError:
+    httpx = None
+
+try:
+    from engines.ai_engine import AIEngine
+    from engines.market_engine import MarketEngine
+    from modules.technical_analysis import TechnicalAnalyzer
+    _ENGINES_IMPORT_ERROR = None
+except ImportError as e:
+    AIEngine = MarketEngine = TechnicalAnalyzer = None
+    _ENGINES_IMPORT_ERROR = e
+
 
-def print_header(title: str):
-    print(f"\n{'='*60}")
-    print(f" {title}")
-    print(f"{'='*60}")
+def _require_engines():
+    """Propaga el error de import de los engines dentro del check que los usa."""
+    if _ENGINES_IMPORT_ERROR is not None:
+        raise _ENGINES_IMPORT_ERROR
 
 
-def print_result(name: str, success: bool, details: str = ""):
+def print_header(title: str, out=None):
+    print(f"\n{'='*60}\n {title}\n{'='*60}", file=out)
+
+
+def print_result(name: str, success: bool, details: str = "", out=None):
     status = "OK" if success else "FAIL"
     icon = "[OK]" if success else "[X]"
-    print(f"  {icon} {name}: {status}")
-    if details:
-        print(f"      {details}")
+    line = f"  {icon} {name}: {status}"
+    print(f"{line}\n      {details}" if details else line, file=out)
+
+
+def run_buffered(check, *args):
+    """
+    v2.2: Ejecuta un check con su salida en un buffer propio y la vuelca en
+    una sola escritura (mismo mecanismo que los checks en paralelo).
+    """
+    buf = io.StringIO()
+    try:
+        return check(*args, out=buf)
+    finally:
+        sys.stdout.write(buf.getvalue())
+
 
+def _module_available(module: str) -> bool:
+    """v2.2: Comprueba si un modulo es importable sin ejecutarlo (find_spec)."""
+    try:
+        return importlib.util.find_spec(module) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+# (modulo, paquete pip) requeridos; sus versiones forman parte de la clave de cache
+REQUIRED_DEPENDENCIES = [
+    ('yaml', 'pyyaml'),
+    ('ccxt', 'ccxt'),
+    ('pandas', 'pandas'),
+    ('numpy', 'numpy'),
+    ('openai', 'openai'),
+    ('ta', 'ta'),
+    ('dotenv', 'python-dotenv'),
+]
+
+# =============================================================================
+# v2.2: Cache de resultados de los checks de red (exchange, IA, analisis)
+# =============================================================================
+# Solo se cachean resultados OK. La clave cambia si cambia el archivo de config
+# (mtime/tamano), las credenciales (solo su hash) o las versiones instaladas.
+
+CACHE_FILE = '.verify_cache.json'
+CACHE_TTL_SECONDS = 600
+CACHEABLE_CHECKS = ('exchange', 'ai', 'test')
+
+_CACHE_ENV_VARS = (
+    'DEEPSEEK_API_KEY', 'OPENAI_API_KEY',
+    'BINANCE_API_KEY', 'BINANCE_API_SECRET',
+    'BINANCE_TESTNET_API_KEY', 'BINANCE_TESTNET_API_SECRET',
+)
+
+CHECK_TITLES = {
+    'exchange': "4. VERIFICANDO CONEXION AL EXCHANGE",
+    'ai': "6. VERIFICANDO CONEXION IA",
+    'test': "9. ANALISIS DE PRUEBA",
+}
+
+
+def _package_version(package: str):
+    try:
+        return importlib.metadata.version(package)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def _cache_key(config_path: str) -> str:
+    """Clave de cache; llamar despues de load_dotenv() para incluir el .env."""
+    st = os.stat(config_path)
+    material = {
+        'config': [os.path.abspath(config_path), st.st_mtime_ns, st.st_size],
+        'env': {var: hashlib.sha1(os.environ.get(var, '').encode()).hexdigest()
+                for var in _CACHE_ENV_VARS},
+        'packages': {pkg: _package_version(pkg) for _, pkg in REQUIRED_DEPENDENCIES},
+    }
+    return hashlib.sha1(json.dumps(material, sort_keys=True).encode()).hexdigest()
+
+
+def _load_cache(key: str) -> dict:
+    """Devuelve {check: timestamp} de los checks OK aun vigentes para esta clave."""
+    try:
+        with open(CACHE_FILE, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get('key') != key:
+        return {}
+    now = time.time()
+    return {name: ts for name, ts in data.get('checks', {}).items()
+            if name in CACHEABLE_CHECKS and now - ts < CACHE_TTL_SECONDS}
+
+
+def _save_cache(key: str, cached: dict, results: dict):
+    """Guarda los checks OK (los cacheados conservan su timestamp original)."""
+    now = time.time()
+    checks = {name: cached.get(name, now) for name in CACHEABLE_CHECKS if results.get(name)}
+    tmp_path = f"{CACHE_FILE}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump({'key': key, 'checks': checks}, f)
+        os.replace(tmp_path, CACHE_FILE)
+    except OSError:
+        pass
+
+
+def report_cached(name: str, timestamp: float, out=None) -> bool:
+    """Imprime un check resuelto desde cache."""
+    print_header(CHECK_TITLES[name], out)
+    age = int(time.time() - timestamp)
+    print_result(name, True, f"(cache, hace {age}s - usar --no-cache para forzar)", out=out)
+    return True
 
-def check_dependencies():
+
+_MISSING = object()
+
+
+def dig(data: dict, *keys, default=None):
+    """
+    v2.2: Acceso anidado data[k1][k2]... sin crear dicts vacios intermedios.
+
+    Devuelve default si falta alguna clave o un nivel no es un dict; los
+    valores falsy existentes (0, False, '') se devuelven tal cual.
+    """
+    for key in keys:
+        if not isinstance(data, dict):
+            return default
+        data = data.get(key, _MISSING)
+        if data is _MISSING:
+            return default
+    return data
+
+
+def _list_dir(path: str) -> set:
+    """v2.2: Nombres de un directorio en una sola lectura (scandir) en vez de un stat por ruta."""
+    try:
+        with os.scandir(path) as entries:
+            return {entry.name for entry in entries}
+    except (FileNotFoundError, NotADirectoryError):
+        return set()
+
+
+def check_dependencies(out=None):
     """Verifica que todas las dependencias esten instaladas."""
-    print_header("1. VERIFICANDO DEPENDENCIAS")
-
-    required = [
-        ('yaml', 'pyyaml'),
-        ('ccxt', 'ccxt'),
-        ('pandas', 'pandas'),
-        ('numpy', 'numpy'),
-        ('openai', 'openai'),
-        ('ta', 'ta'),
-        ('dotenv', 'python-dotenv'),
-    ]
+    print_header("1. VERIFICANDO DEPENDENCIAS", out)
+
+    required = REQUIRED_DEPENDENCIES
 
     optional = [
         ('pydantic', 'pydantic'),
@@ -56,69 +236,103 @@ def check_dependencies():
 
     all_ok = True
 
-    print("\n  Dependencias requeridas:")
+    print("\n  Dependencias requeridas:", file=out)
     for module, package in required:
-        try:
-            __import__(module)
-            print_result(f"  {package}", True)
-        except ImportError:
-            print_result(f"  {package}", False, f"pip install {package}")
+        if _module_available(module):
+            print_result(f"  {package}", True, out=out)
+        else:
+            print_result(f"  {package}", False, f"pip install {package}", out=out)
             all_ok = False
 
-    print("\n  Dependencias opcionales:")
+    print("\n  Dependencias opcionales:", file=out)
     for module, package in optional:
-        try:
-            __import__(module)
-            print_result(f"  {package}", True)
-        except ImportError:
-            print_result(f"  {package}", False, "(opcional)")
+        if _module_available(module):
+            print_result(f"  {package}", True, out=out)
+        else:
+            print_result(f"  {package}", False, "(opcional)", out=out)
 
     return all_ok
 
 
-def check_config(config_path: str):
-    """Verifica la configuracion."""
-    print_header("2. VERIFICANDO CONFIGURACION")
+# Campos minimos para operar (ruta de claves en la config)
+CRITICAL_FIELDS = [
+    ('trading', 'mode'),
+    ('trading', 'symbols'),
+    ('risk_management', 'initial_capital'),
+    ('ai_provider',),
+]
 
-    import yaml
+
+def _mapping_get(loader, node, key: str):
+    """Nodo valor de `key` en un MappingNode YAML (None si no existe)."""
+    if not isinstance(node, yaml.MappingNode):
+        return None
+    loader.flatten_mapping(node)  # resuelve merge keys (<<)
+    # La ultima aparicion gana, igual que al construir el dict
+    for key_node, value_node in reversed(node.value):
+        if isinstance(key_node, yaml.ScalarNode) and key_node.value == key:
+            return value_node
+    return None
+
+
+def check_config(config_path: str, out=None):
+    """
+    Verifica la configuracion.
+
+    v2.2: Compone el documento a nodos, lee los campos criticos de esos
+    nodos y construye el dict completo una unica vez a partir del mismo arbol.
+    Aunque falte un campo critico se devuelve la config para que el resto de
+    checks se ejecute igualmente.
+    """
+    print_header("2. VERIFICANDO CONFIGURACION", out)
 
     if not os.path.exists(config_path):
-        print_result("Archivo config", False, f"No existe: {config_path}")
+        print_result("Archivo config", False, f"No existe: {config_path}", out=out)
         return False, None
 
     try:
         with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
-        print_result("Archivo config", True, config_path)
+            loader = _YLoader(f)
+            try:
+                root = loader.get_single_node()
+                if not isinstance(root, yaml.MappingNode):
+                    raise ValueError("La config debe ser un mapeo YAML")
+
+                checks = []
+                for path in CRITICAL_FIELDS:
+                    node = root
+                    for key in path:
+                        node = _mapping_get(loader, node, key)
+                    value = loader.construct_object(node, deep=True) if node is not None else None
+                    checks.append(('.'.join(path), value))
+
+                all_ok = all(value for _, value in checks)
+                config = loader.construct_document(root)
+            finally:
+                loader.dispose()
+        print_result("Archivo config", True, config_path, out=out)
     except Exception as e:
-        print_result("Archivo config", False, str(e))
+        print_result("Archivo config", False, str(e), out=out)
         return False, None
 
     # Verificar campos criticos
-    checks = [
-        ('trading.mode', config.get('trading', {}).get('mode')),
-        ('trading.symbols', config.get('trading', {}).get('symbols')),
-        ('risk_management.initial_capital', config.get('risk_management', {}).get('initial_capital')),
-        ('ai_provider', config.get('ai_provider')),
-    ]
-
-    all_ok = True
     for field, value in checks:
         if value:
-            print_result(f"  {field}", True, str(value)[:50])
+            print_result(f"  {field}", True, str(value)[:50], out=out)
         else:
-            print_result(f"  {field}", False, "No configurado")
-            all_ok = False
+            print_result(f"  {field}", False, "No configurado", out=out)
 
     return all_ok, config
 
 
-def check_env_vars():
+def check_env_vars(out=None):
     """Verifica variables de entorno."""
-    print_header("3. VERIFICANDO VARIABLES DE ENTORNO")
+    print_header("3. VERIFICANDO VARIABLES DE ENTORNO", out)
 
-    from dotenv import load_dotenv
-    load_dotenv()
+    if load_dotenv is not None:
+        load_dotenv()
+    # v2.2: Una sola copia del entorno (despues de cargar el .env)
+    env = dict(os.environ)
 
     required_vars = [
         'DEEPSEEK_API_KEY',
@@ -134,175 +348,227 @@ def check_env_vars():
 
     all_ok = True
 
-    print("\n  Variables requeridas:")
+    print("\n  Variables requeridas:", file=out)
     for var in required_vars:
-        value = os.getenv(var)
+        value = env.get(var)
         if value:
-            masked = value[:8] + "..." + value[-4:] if len(value) > 15 else "***"
-            print_result(f"  {var}", True, masked)
+            masked = f"{value[:8]}...{value[-4:]}" if len(value) > 15 else "***"
+            print_result(f"  {var}", True, masked, out=out)
         else:
-            print_result(f"  {var}", False, "No configurada")
+            print_result(f"  {var}", False, "No configurada", out=out)
             all_ok = False
 
-    print("\n  Variables opcionales:")
+    print("\n  Variables opcionales:", file=out)
     for var in optional_vars:
-        value = os.getenv(var)
-        if value:
-            print_result(f"  {var}", True)
+        if env.get(var):
+            print_result(f"  {var}", True, out=out)
         else:
-            print_result(f"  {var}", False, "(opcional)")
+            print_result(f"  {var}", False, "(opcional)", out=out)
 
     return all_ok
 
 
-def check_exchange_connection(config: dict):
-    """Verifica conexion al exchange."""
-    print_header("4. VERIFICANDO CONEXION AL EXCHANGE")
-
-    try:
-        from engines.market_engine import MarketEngine
+def check_exchange_connection(config: dict, out=None):
+    """
+    Verifica conexion al exchange.
 
-        # Crear market engine con config
-        import tempfile
-        import yaml
+    v2.2: Devuelve (ok, engine) para que el analisis de prueba reutilice la
+    misma conexion (un solo load_markets/handshake por verificacion).
+    """
+    print_header(CHECK_TITLES['exchange'], out)
 
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            yaml.dump(config, f)
-            temp_config = f.name
+    engine = None
+    try:
+        _require_engines()
 
-        engine = MarketEngine(temp_config)
-        os.unlink(temp_config)
+        # Crear market engine con la config ya cargada
+        engine = MarketEngine(config)
 
         # Verificar conexion
         if engine.connection:
             exchange_name = getattr(engine, 'exchange_name', engine.connection.name if engine.connection else 'Unknown')
-            print_result("Conexion exchange", True, exchange_name)
+            print_result("Conexion exchange", True, exchange_name, out=out)
 
             # Obtener balance
             try:
                 balance = engine.get_balance()
                 usdt = balance.get('USDT', 0)
-                print_result("  Balance USDT", True, f"${usdt:.2f}")
+                print_result("  Balance USDT", True, f"${usdt:.2f}", out=out)
             except Exception as e:
-                print_result("  Balance USDT", False, str(e))
+                print_result("  Balance USDT", False, str(e), out=out)
 
             # Obtener precio de BTC
             try:
                 price = engine.get_current_price('BTC/USDT')
-                print_result("  Precio BTC/USDT", True, f"${price:,.2f}")
+                print_result("  Precio BTC/USDT", True, f"${price:,.2f}", out=out)
             except Exception as e:
-                print_result("  Precio BTC/USDT", False, str(e))
+                print_result("  Precio BTC/USDT", False, str(e), out=out)
 
-            return True
+            return True, engine
         else:
-            print_result("Conexion exchange", False, "No se pudo conectar")
-            return False
+            print_result("Conexion exchange", False, "No se pudo conectar", out=out)
+            return False, engine
 
     except Exception as e:
-        print_result("Conexion exchange", False, str(e))
-        return False
+        print_result("Conexion exchange", False, str(e), out=out)
+        return False, engine
 
 
-def check_database():
-    """Verifica la base de datos SQLite."""
-    print_header("5. VERIFICANDO BASE DE DATOS")
+# PRAGMA table_list existe desde SQLite 3.37; antes es un no-op silencioso
+_HAS_PRAGMA_TABLE_LIST = sqlite3.sqlite_version_info >= (3, 37, 0)
+
+
+def _count_tables(db_path: str) -> int:
+    """
+    v2.2: Cuenta las tablas de una DB abriendola en solo lectura.
 
-    import sqlite3
+    mode=ro no crea la DB si no existe (con una DB en modo WAL, SQLite puede
+    crear igualmente los ficheros -wal/-shm). PRAGMA schema_version lee solo
+    la cabecera y sirve de prueba de vida (falla si el fichero no es una DB);
+    PRAGMA table_list evita recorrer sqlite_master.
+    """
+    uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True)
+    try:
+        conn.execute("PRAGMA schema_version").fetchone()
+        if _HAS_PRAGMA_TABLE_LIST:
+            rows = conn.execute("PRAGMA table_list").fetchall()
+            # (schema, name, type, ...): mismas tablas que lista sqlite_master
+            return sum(1 for schema, name, kind, *_ in rows
+                       if schema == 'main' and kind == 'table' and name != 'sqlite_schema')
+        rows = conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()
+        return len(rows)
+    finally:
+        conn.close()
+
+
+def check_database(out=None):
+    """Verifica la base de datos SQLite."""
+    print_header("5. VERIFICANDO BASE DE DATOS", out)
 
     databases = [
-        ('data/positions.db', 'Posiciones'),
-        ('data/risk_manager.db', 'Risk Manager'),
+        ('positions.db', 'Posiciones'),
+        ('risk_manager.db', 'Risk Manager'),
     ]
 
     all_ok = True
+    existing = _list_dir('data')
 
-    for db_path, name in databases:
-        if os.path.exists(db_path):
+    for db_file, name in databases:
+        db_path = os.path.join('data', db_file)
+        if db_file in existing:
             try:
-                conn = sqlite3.connect(db_path)
-                cursor = conn.cursor()
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-                tables = [row[0] for row in cursor.fetchall()]
-                conn.close()
-                print_result(f"{name}", True, f"{len(tables)} tablas")
+                tables = _count_tables(db_path)
+                print_result(f"{name}", True, f"{tables} tablas", out=out)
             except Exception as e:
-                print_result(f"{name}", False, str(e))
+                print_result(f"{name}", False, str(e), out=out)
                 all_ok = False
         else:
-            print_result(f"{name}", True, "Se creara al iniciar")
+            print_result(f"{name}", True, "Se creara al iniciar", out=out)
 
     return all_ok
 
 
-def check_ai_connection(config: dict):
-    """Verifica conexion a la IA."""
-    print_header("6. VERIFICANDO CONEXION IA")
+@functools.lru_cache(maxsize=4)
+def _get_ai_client(api_key: str, base_url):
+    """
+    v2.2: Cliente OpenAI memoizado por (key, base_url): llamadas repetidas
+    (--deep, reintentos) reutilizan el mismo pool HTTP y sesion TLS.
+    """
+    kwargs = {}
+    if httpx is not None:
+        kwargs['http_client'] = httpx.Client(limits=httpx.Limits(max_keepalive_connections=4))
+    return OpenAI(api_key=api_key, base_url=base_url, **kwargs)
+
+
+def check_ai_connection(config: dict, deep: bool = False, out=None):
+    """
+    Verifica conexion a la IA.
+
+    v2.2: Por defecto solo lista los modelos (autentica la key y comprueba
+    conectividad sin inferencia ni coste de tokens). Con deep=True (--deep)
+    hace ademas una llamada de chat real.
+    """
+    print_header(CHECK_TITLES['ai'], out)
 
     provider = config.get('ai_provider', 'deepseek')
     model = config.get('ai_model', 'deepseek-chat')
 
-    print(f"  Provider: {provider}")
-    print(f"  Model: {model}")
+    print(f"  Provider: {provider}", file=out)
+    print(f"  Model: {model}", file=out)
 
-    try:
-        from openai import OpenAI
+    if provider == 'deepseek':
+        api_key = os.getenv('DEEPSEEK_API_KEY')
+        base_url = "https://api.deepseek.com"
+    else:
+        api_key = os.getenv('OPENAI_API_KEY')
+        base_url = None
 
-        if provider == 'deepseek':
-            api_key = os.getenv('DEEPSEEK_API_KEY')
-            base_url = "https://api.deepseek.com"
-        else:
-            api_key = os.getenv('OPENAI_API_KEY')
-            base_url = None
+    # Sin key no hay nada que verificar: salir antes de tocar el SDK
+    if not api_key:
+        print_result("API Key", False, "No configurada", out=out)
+        return False
 
-        if not api_key:
-            print_result("API Key", False, "No configurada")
-            return False
+    try:
+        if OpenAI is None:
+            raise ImportError("openai no instalado (pip install openai)")
 
-        client = OpenAI(api_key=api_key, base_url=base_url)
+        client = _get_ai_client(api_key, base_url)
 
-        # Hacer una llamada simple de prueba
+        # Listado de modelos: sin inferencia
         start = time.time()
-        response = client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": "Responde solo: OK"}],
-            max_tokens=10,
-            temperature=0
-        )
+        model_ids = {m.id for m in client.models.list()}
         latency = (time.time() - start) * 1000
 
-        content = response.choices[0].message.content
-        print_result("Conexion IA", True, f"{latency:.0f}ms")
-        print_result("  Respuesta", True, content[:50])
+        print_result("Conexion IA", True, f"{latency:.0f}ms ({len(model_ids)} modelos)", out=out)
+        if model not in model_ids:
+            # Solo aviso: el check es de conectividad; --deep prueba el modelo
+            print(f"  [!] Modelo {model} no listado por el proveedor", file=out)
+
+        if deep:
+            # Hacer una llamada simple de prueba
+            start = time.time()
+            response = client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": "Responde solo: OK"}],
+                max_tokens=10,
+                temperature=0
+            )
+            latency = (time.time() - start) * 1000
+
+            content = response.choices[0].message.content
+            print_result("  Respuesta", True, f"{content[:50]} ({latency:.0f}ms)", out=out)
 
         return True
 
     except Exception as e:
-        print_result("Conexion IA", False, str(e))
+        print_result("Conexion IA", False, str(e), out=out)
         return False
 
 
-def check_directories():
+def check_directories(out=None):
     """Verifica y crea directorios necesarios."""
-    print_header("7. VERIFICANDO DIRECTORIOS")
+    print_header("7. VERIFICANDO DIRECTORIOS", out)
 
     directories = ['data', 'logs', 'config']
+    existing = _list_dir('.')
 
     for dir_name in directories:
-        if os.path.exists(dir_name):
-            print_result(dir_name, True, "Existe")
+        if dir_name in existing:
+            print_result(dir_name, True, "Existe", out=out)
         else:
             try:
                 os.makedirs(dir_name, exist_ok=True)
-                print_result(dir_name, True, "Creado")
+                print_result(dir_name, True, "Creado", out=out)
             except Exception as e:
-                print_result(dir_name, False, str(e))
+                print_result(dir_name, False, str(e), out=out)
 
     return True
 
 
-def show_config_summary(config: dict):
+def show_config_summary(config: dict, out=None):
     """Muestra resumen de la configuracion."""
-    print_header("8. RESUMEN DE CONFIGURACION")
+    print_header("8. RESUMEN DE CONFIGURACION", out)
 
     trading = config.get('trading', {})
     risk = config.get('risk_management', {})
@@ -321,93 +587,108 @@ def show_config_summary(config: dict):
     - Max risk/trade: {risk.get('max_risk_per_trade', 0)}%
     - Max drawdown diario: {risk.get('max_daily_drawdown', 0)}%
     - R/R minimo: {risk.get('min_risk_reward_ratio', 0)}:1
-    - Kelly: {'ON' if risk.get('kelly_criterion', {}).get('enabled') else 'OFF'}
-    - ATR Stops: {'ON' if risk.get('atr_stops', {}).get('enabled') else 'OFF'}
+    - Kelly: {'ON' if dig(risk, 'kelly_criterion', 'enabled') else 'OFF'}
+    - ATR Stops: {'ON' if dig(risk, 'atr_stops', 'enabled') else 'OFF'}
 
   Posiciones:
-    - Max posiciones: {position.get('portfolio', {}).get('max_concurrent_positions', 0)}
-    - Max exposicion: {position.get('portfolio', {}).get('max_exposure_percent', 0)}%
-    - Trailing stop: {'ON' if position.get('trailing_stop', {}).get('enabled') else 'OFF'}
+    - Max posiciones: {dig(position, 'portfolio', 'max_concurrent_positions', default=0)}
+    - Max exposicion: {dig(position, 'portfolio', 'max_exposure_percent', default=0)}%
+    - Trailing stop: {'ON' if dig(position, 'trailing_stop', 'enabled') else 'OFF'}
 
   IA:
     - Provider: {config.get('ai_provider', 'N/A')}
     - Model fast: {config.get('ai_model_fast', 'N/A')}
     - Model deep: {config.get('ai_model_deep', 'N/A')}
     - Hybrid: {'ON' if config.get('ai_use_hybrid_analysis') else 'OFF'}
-""")
+""", file=out)
 
 
-def run_test_analysis(config: dict):
-    """Ejecuta un analisis de prueba."""
-    print_header("9. ANALISIS DE PRUEBA")
+def run_test_analysis(config: dict, market_engine=None, verbose: bool = False, out=None):
+    """
+    Ejecuta un analisis de prueba con el MarketEngine del check de exchange.
 
-    try:
-        from engines.ai_engine import AIEngine
-        from engines.market_engine import MarketEngine
-        from modules.technical_analysis import TechnicalAnalyzer
+    El traceback de un error solo se imprime con verbose (--verbose).
+    """
+    print_header(CHECK_TITLES['test'], out)
 
-        import tempfile
-        import yaml
+    if market_engine is None:
+        print_result("Analisis de prueba", False, "Sin conexion al exchange (ver check 4)", out=out)
+        return False
 
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            yaml.dump(config, f)
-            temp_config = f.name
+    try:
+        _require_engines()
 
-        print("  Inicializando componentes...")
-        market_engine = MarketEngine(temp_config)
-        ai_engine = AIEngine(temp_config)
+        print("  Inicializando componentes...", file=out)
+        AIEngine(config)
         tech_analyzer = TechnicalAnalyzer(config)
 
-        os.unlink(temp_config)
-
-        symbol = config.get('trading', {}).get('symbols', ['BTC/USDT'])[0]
-        timeframe = config.get('trading', {}).get('timeframe', '15m')
+        symbol = dig(config, 'trading', 'symbols', default=['BTC/USDT'])[0]
+        timeframe = dig(config, 'trading', 'timeframe', default='15m')
 
-        print(f"  Obteniendo datos de {symbol} ({timeframe})...")
+        print(f"  Obteniendo datos de {symbol} ({timeframe})...", file=out)
         ohlcv = market_engine.get_historical_data(symbol, timeframe=timeframe, limit=150)
 
         if not ohlcv:
-            print_result("Datos OHLCV", False, "No se obtuvieron datos")
+            print_result("Datos OHLCV", False, "No se obtuvieron datos", out=out)
             return False
 
-        print_result("Datos OHLCV", True, f"{len(ohlcv)} velas")
+        print_result("Datos OHLCV", True, f"{len(ohlcv)} velas", out=out)
 
-        print("  Calculando indicadores tecnicos...")
-        tech_data = tech_analyzer.analyze(ohlcv)
+        # v2.2: Pre-filtro primero, con solo el ADX (como el bot): el resto de
+        # indicadores se calcula unicamente si el pre-filtro pasa
+        print("\n  Ejecutando pre-filtro local...", file=out)
+        adx_data = tech_analyzer.adx_only(ohlcv)
 
-        if not tech_data:
-            print_result("Indicadores", False, "Error calculando")
+        if not adx_data:
+            print_result("ADX", False, "Error calculando", out=out)
             return False
 
-        print_result("Indicadores", True)
-        print(f"      RSI: {tech_data.get('rsi', 'N/A'):.2f}")
-        print(f"      ADX: {tech_data.get('adx', 'N/A'):.2f}")
-        print(f"      EMA50: ${tech_data.get('ema_50', 0):,.2f}")
-        print(f"      Precio: ${tech_data.get('current_price', 0):,.2f}")
+        adx = adx_data['adx']
+        min_adx = dig(config, 'ai_agents', 'min_adx_trend', default=20)
 
-        print("\n  Ejecutando pre-filtro local...")
-        tech_data['symbol'] = symbol
+        if adx < min_adx:
+            print(f"      Pre-filtro: RECHAZADO (ADX {adx:.1f} < {min_adx})", file=out)
+            print("      Ahorro: No se calcularon el resto de indicadores ni se llamo a la IA ($0)", file=out)
+            return True
 
-        # Simular pre-filtro
-        adx = tech_data.get('adx', 0)
-        min_adx = config.get('ai_agents', {}).get('min_adx_trend', 20)
+        print(f"      Pre-filtro: PASADO (ADX {adx:.1f} >= {min_adx})", file=out)
 
-        if adx < min_adx:
-            print(f"      Pre-filtro: RECHAZADO (ADX {adx:.1f} < {min_adx})")
-            print(f"      Ahorro: No se llamo a la IA ($0)")
-        else:
-            print(f"      Pre-filtro: PASADO (ADX {adx:.1f} >= {min_adx})")
-            print("      El sistema llamaria a la IA para analisis completo")
+        print("  Calculando indicadores tecnicos...", file=out)
+        tech_data = tech_analyzer.analyze(ohlcv)
+
+        if not tech_data:
+            print_result("Indicadores", False, "Error calculando", out=out)
+            return False
+
+        print_result("Indicadores", True, out=out)
+        print(f"      RSI: {tech_data.get('rsi', 'N/A'):.2f}", file=out)
+        print(f"      ADX: {tech_data.get('adx', 'N/A'):.2f}", file=out)
+        print(f"      EMA50: ${tech_data.get('ema_50', 0):,.2f}", file=out)
+        print(f"      Precio: ${tech_data.get('current_price', 0):,.2f}", file=out)
+        print("      El sistema llamaria a la IA para analisis completo", file=out)
 
         return True
 
     except Exception as e:
-        print_result("Analisis de prueba", False, str(e))
-        import traceback
-        traceback.print_exc()
+        print_result("Analisis de prueba", False, str(e), out=out)
+        if verbose:
+            traceback.print_exc(file=out)
         return False
 
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="SATH - Verificacion del sistema")
+    parser.add_argument('config', nargs='?', default='config/config_paper.yaml',
+                        help="Archivo de configuracion (default: config/config_paper.yaml)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Ignorar resultados cacheados de exchange/IA/analisis")
+    parser.add_argument('--deep', action='store_true',
+                        help="Verificar la IA con una llamada de chat real (consume tokens)")
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help="Mostrar traceback completo de los errores")
+    return parser.parse_args(argv)
+
+
 def main():
     print("""
     ================================================================
@@ -418,55 +699,93 @@ def main():
     ================================================================
     """)
 
-    # Determinar archivo de config
-    if len(sys.argv) > 1:
-        config_path = sys.argv[1]
-    else:
-        config_path = 'config/config_paper.yaml'
+    args = parse_args()
+    config_path = args.config
 
     print(f"  Config: {config_path}")
     print(f"  Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
     results = {}
+    failed = []  # v2.2: se acumula al registrar cada resultado
+
+    def record(key: str, ok: bool):
+        results[key] = ok
+        if not ok:
+            failed.append(key)
 
     # 1. Dependencias
-    results['deps'] = check_dependencies()
+    record('deps', run_buffered(check_dependencies))
 
     # 2. Configuracion
-    config_ok, config = check_config(config_path)
-    results['config'] = config_ok
+    config_ok, config = run_buffered(check_config, config_path)
+    record('config', config_ok)
 
     if not config:
         print("\n[ERROR] No se pudo cargar la configuracion. Abortando.")
         return 1
 
-    # 3. Variables de entorno
-    results['env'] = check_env_vars()
-
-    # 4. Directorios
-    results['dirs'] = check_directories()
-
-    # 5. Base de datos
-    results['db'] = check_database()
-
-    # 6. Exchange
-    results['exchange'] = check_exchange_connection(config)
+    # v2.2: Checks 3-7 son independientes entre si (exchange e IA son de red):
+    # se ejecutan en paralelo, cada uno escribe en su propio buffer y la salida
+    # se vuelca en el orden de envio para conservar el layout en pantalla.
+    # load_dotenv() antes de despachar para que exchange/IA vean el .env.
+    if load_dotenv is not None:
+        load_dotenv()
+
+    cache_key = _cache_key(config_path)
+    cached = {} if args.no_cache else _load_cache(cache_key)
+    # Exchange y analisis comparten el MarketEngine: se saltan solo juntos
+    skip_exchange = 'exchange' in cached and 'test' in cached
+
+    parallel_checks = [
+        ('env', check_env_vars, ()),
+        ('dirs', check_directories, ()),
+        ('db', check_database, ()),
+        ('exchange', check_exchange_connection, (config,)),
+        ('ai', check_ai_connection, (config, args.deep)),
+    ]
+    if skip_exchange:
+        parallel_checks[3] = ('exchange', report_cached, ('exchange', cached['exchange']))
+    if 'ai' in cached and not args.deep:
+        parallel_checks[4] = ('ai', report_cached, ('ai', cached['ai']))
+
+    with ThreadPoolExecutor(max_workers=len(parallel_checks)) as pool:
+        pending = []
+        for key, check, check_args in parallel_checks:
+            buf = io.StringIO()
+            pending.append((key, pool.submit(check, *check_args, out=buf), buf))
+
+        market_engine = None
+        for key, future, buf in pending:
+            try:
+                if key == 'exchange' and not skip_exchange:
+                    ok, market_engine = future.result()
+                else:
+                    ok = future.result()
+            except Exception as e:
+                print_result(key, False, str(e), out=buf)
+                ok = False
+            record(key, ok)
+            sys.stdout.write(buf.getvalue())
 
-    # 7. IA
-    results['ai'] = check_ai_connection(config)
+    try:
+        # 8. Resumen config
+        run_buffered(show_config_summary, config)
 
-    # 8. Resumen config
-    show_config_summary(config)
+        # 9. Analisis de prueba (reutiliza el MarketEngine del check 4)
+        if skip_exchange:
+            record('test', run_buffered(report_cached, 'test', cached['test']))
+        else:
+            record('test', run_buffered(run_test_analysis, config, market_engine, args.verbose))
+    finally:
+        if market_engine is not None:
+            market_engine.close_connection()
 
-    # 9. Analisis de prueba
-    results['test'] = run_test_analysis(config)
+    _save_cache(cache_key, cached, results)
 
     # Resumen final
     print_header("RESULTADO FINAL")
 
-    all_passed = all(results.values())
-
-    if all_passed:
+    if not failed:
         print("""
     ================================================================
      SISTEMA LISTO PARA OPERAR
@@ -482,7 +801,6 @@ def main():
         """)
         return 0
     else:
-        failed = [k for k, v in results.items() if not v]
         print(f"""
     ================================================================
      SISTEMA NO LISTO - CORREGIR ERRORES